@@ -1,15 +1,27 @@
-from agentic_workflow.manager.expert_runner import (
-    ExpertRunner,
-    ExpertRegistry,
-    BaseExpert,
-    ExpertStatus
-)
+import importlib
+
+# Exports are imported on first access (PEP 562) so importing the package stays cheap
+_LAZY_EXPORTS = {
+    'ExpertRunner': 'agentic_workflow.manager.expert_runner',
+    'ExpertRegistry': 'agentic_workflow.manager.expert_runner',
+    'BaseExpert': 'agentic_workflow.manager.expert_runner',
+    'ExpertStatus': 'agentic_workflow.manager.expert_runner',
+    'BusinessStrategistExpert': 'agentic_workflow.experts.business_strategist',
+    'MarketAnalystExpert': 'agentic_workflow.experts.market_analyst',
+    'FinancialAdvisorExpert': 'agentic_workflow.experts.financial_advisor',
+    'LegalAdvisorExpert': 'agentic_workflow.experts.legal_advisor',
+    'TechnicalAdvisorExpert': 'agentic_workflow.experts.technical_advisor'
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
 
-from .business_strategist import BusinessStrategistExpert
-from .market_analyst import MarketAnalystExpert
-from .financial_advisor import FinancialAdvisorExpert
-from .legal_advisor import LegalAdvisorExpert
-from .technical_advisor import TechnicalAdvisorExpert
 
 __all__ = [
     'ExpertRunner',
@@ -0,0 +1,14 @@
+"""
+Shared prompt parts for the Anna experts
+Every expert prompt starts with the same text so repeated calls share a cacheable prefix
+"""
+
+# System message shared by all experts; expert-specific instructions go in the user message
+COMMON_SYSTEM_PROMPT = "You are an expert advisor on a panel that coaches entrepreneurs. Provide practical, actionable guidance."
+
+# Opening of every expert prompt, followed by the expert's FOCUS_AREAS and then the question.
+# Shared text first and the expert's specialization last, so all experts share the longest identical prefix
+COMMON_PREFIX = """Answer the question below from your own area of expertise only.
+Keep the answer structured and specific to the entrepreneur's situation.
+
+"""
@@ -1,16 +1,20 @@
-import json
+import os
+import orjson
+import time
 import asyncio
-from abc import ABC, abstractmethod
+import importlib
+from abc import ABC
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional, Type,Annotated
+from typing import Dict, Any, List, Optional, Type, Union, Annotated, AsyncIterator
 from datetime import datetime, timezone
 from langgraph.graph import add_messages
 from enum import Enum
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 
-from agentic_workflow.resource import AnnaLLMRegistry, LoggerFactory, ExpertDecision, dev_draw_mermaid
+from agentic_workflow.resource import AnnaLLMRegistry, LoggerFactory, ExpertDecision, LLMCache, BatchLLMClient, dev_draw_mermaid
 
 
 class ExpertStatus(Enum):
@@ -22,35 +26,40 @@ class ExpertStatus(Enum):
     OPTED_OUT = "opted_out"
 
 
-@dataclass
+@dataclass(slots=True)
 class ExpertResponse:
     """Individual expert response"""
     name: str
     request: str = ""
     response: str = ""
-    opt_in: str = ""
+    opt_in: bool = False
     error: str = ""
     execution_time: float = 0.0
     status: ExpertStatus = ExpertStatus.PENDING
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    @property
+    def opt_in_text(self) -> str:
+        """Opt-in decision as the legacy "yes"/"no" string"""
+        return "yes" if self.opt_in else "no"
+
 def merge_expert_responses(existing: Dict[str, ExpertResponse], new: Dict[str, ExpertResponse]) -> Dict[str, ExpertResponse]:
     """Merge function: updates existing dict with new entries"""
-    merged = dict(existing)
-    merged.update(new)   # new responses overwrite by key
-    return merged
+    return existing | new   # new responses overwrite by key, without mutating existing
 
 def merge_metadata(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
     """Merge function: combine metadata dicts, new values overwrite old ones"""
-    merged = dict(existing)
-    merged.update(new)
-    return merged
+    return existing | new
 
 def latest_timestamp(old: str, new: str) -> str:
     """Always keep the latest timestamp value"""
     return new
 
-@dataclass
+def format_sse(event: Dict[str, Any]) -> str:
+    """Format a streamed expert event as a Server-Sent Events message"""
+    return f"data: {orjson.dumps(event).decode()}\n\n"
+
+@dataclass(slots=True)
 class ExpertRunnerState:
     """State for expert runner containing multiple expert responses"""
     expert_responses: Annotated[Dict[str, ExpertResponse], merge_expert_responses] = field(default_factory=dict)
@@ -63,14 +72,42 @@ class ExpertRunnerState:
 
 class BaseExpert(ABC):
     """Base class for all experts"""
-    
+
+    # Coaching LLM shared by all expert instances (see _shared_llm)
+    _llm = None
+
+    # Exact-match cache of expert responses, shared by all experts (see arun_cached)
+    _response_cache = LLMCache(maxsize=1024, ttl=3600)
+
+    # Prompt parts used by stream(); experts that leave them unset stream their full response as one chunk
+    SYSTEM_PROMPT: Optional[str] = None
+    STATIC_PREFIX: Optional[str] = None
+
     def __init__(self, name: str, description: str, correlation_id: Optional[str] = None):
         self.name = name
         self.description = description
         self.correlation_id = correlation_id
-        self.llm = AnnaLLMRegistry().get_coaching_llm()
+        self.llm = self._shared_llm()
         self.logger = LoggerFactory.get_expert_logger(name, correlation_id)
-    
+        self._decision: Optional[ExpertDecision] = None
+
+    @classmethod
+    def _shared_llm(cls):
+        """Get the coaching LLM, creating it on first use only"""
+        if BaseExpert._llm is None:
+            BaseExpert._llm = AnnaLLMRegistry().get_coaching_llm()
+        return BaseExpert._llm
+
+    def _get_decision(self) -> ExpertDecision:
+        """Get this expert's opt-in decision maker, creating it on first use only"""
+        if self._decision is None:
+            self._decision = ExpertDecision(
+                expert_name=self.name,
+                description=self.description,
+                correlation_id=self.correlation_id
+            )
+        return self._decision
+
     def opt_in(self, user_prompt: str) -> bool:
         """
         Determine if this expert should opt-in to answer the user's question
@@ -82,93 +119,230 @@ class BaseExpert(ABC):
             True if the expert should answer, False otherwise
         """
         try:
-            # Create expert decision instance
-            expert_decision = ExpertDecision(
-                expert_name=self.name,
-                description=self.description,
-                correlation_id=self.correlation_id
-            )
-            
             # Make decision on whether to opt-in
-            should_answer = expert_decision.make_decision(user_prompt)
+            should_answer = self._get_decision().make_decision(user_prompt)
+            
+            self.logger.info("Expert %s opt-in decision: %s", self.name, should_answer)
+            return should_answer
+            
+        except Exception as e:
+            self.logger.error("Failed to make opt-in decision for %s: %s", self.name, e)
+            # Default to False (don't answer) if there's an error
+            return False
+    
+    async def aopt_in(self, user_prompt: str) -> bool:
+        """
+        Async variant of opt_in used by the expert runner
+        
+        Args:
+            user_prompt: The user's request/prompt
+            
+        Returns:
+            True if the expert should answer, False otherwise
+        """
+        try:
+            should_answer = await self._get_decision().amake_decision(user_prompt)
             
-            self.logger.info(f"Expert {self.name} opt-in decision: {should_answer}")
+            self.logger.info("Expert %s opt-in decision: %s", self.name, should_answer)
             return should_answer
             
         except Exception as e:
-            self.logger.error(f"Failed to make opt-in decision for {self.name}: {str(e)}")
+            self.logger.error("Failed to make opt-in decision for %s: %s", self.name, e)
             # Default to False (don't answer) if there's an error
             return False
     
-    @abstractmethod
     def run(self, user_prompt: str) -> str:
-        """Execute the expert's main logic and return response"""
-        pass
+        """
+        Execute the expert's main logic and return response.
+        By default the coaching LLM answers build_prompt() under SYSTEM_PROMPT;
+        experts without a STATIC_PREFIX must override this.
+        """
+        if self.STATIC_PREFIX is None:
+            raise NotImplementedError(f"{type(self).__name__} must set STATIC_PREFIX or override run()")
+        try:
+            response = self.llm.quick_prompt(self.build_prompt(user_prompt), system=self.SYSTEM_PROMPT)
+            return self._response_text(response)
+        except Exception as e:
+            self.logger.error("Expert %s execution failed: %s", self.name, e)
+            raise
+    
+    async def arun(self, user_prompt: str) -> str:
+        """
+        Async variant of run used by the expert runner.
+        Experts that only override the blocking run() run it in a worker thread.
+        """
+        if self.STATIC_PREFIX is None:
+            return await asyncio.to_thread(self.run, user_prompt)
+        try:
+            response = await self.llm.quick_prompt_async(self.build_prompt(user_prompt), system=self.SYSTEM_PROMPT)
+            return self._response_text(response)
+        except Exception as e:
+            self.logger.error("Expert %s execution failed: %s", self.name, e)
+            raise
+    
+    def _response_text(self, response) -> str:
+        """Text of an LLM response"""
+        response_text = response.content if hasattr(response, 'content') else str(response)
+        self.logger.info("Expert %s response generated successfully", self.name)
+        return response_text
+    
+    async def arun_cached(self, user_prompt: str) -> str:
+        """Run the expert asynchronously, reusing the cached response for an identical prompt"""
+        cache_key = LLMCache.cache_key("response", self.name, self.SYSTEM_PROMPT or "", user_prompt)
+        response = self._response_cache.get(cache_key)
+        if response is not None:
+            self.logger.info("Expert %s response served from cache", self.name)
+            return response
+        
+        response = await self.arun(user_prompt)
+        self._response_cache.set(cache_key, response)
+        return response
+    
+    async def stream(self, user_prompt: str) -> AsyncIterator[str]:
+        """
+        Stream the expert's response as text chunks
+        
+        Args:
+            user_prompt: The user's request/prompt
+            
+        Yields:
+            Response text chunks as they are generated
+        """
+        if self.STATIC_PREFIX is None:
+            yield await self.arun(user_prompt)
+            return
+        
+        async for delta in self.llm.quick_prompt_stream(self.build_prompt(user_prompt), system=self.SYSTEM_PROMPT):
+            yield delta
+    
+    def build_prompt(self, user_prompt: str) -> str:
+        """Build the advice prompt from the static prefix and the user's question"""
+        return "".join((self.STATIC_PREFIX, "\nQuestion: ", user_prompt))
 
 
 class ExpertRegistry:
     """Registry for managing experts"""
     
     def __init__(self):
-        self._experts: Dict[str, Type[BaseExpert]] = {}
+        # Expert classes by name; lazily registered experts hold their module path until first use
+        self._experts: Dict[str, Union[Type[BaseExpert], str]] = {}
         self.logger = LoggerFactory.get_logger("ExpertRegistry")
     
     def register_expert(self, expert_class: Type[BaseExpert]) -> None:
         """Register an expert class"""
         expert_name = expert_class.__name__
         self._experts[expert_name] = expert_class
-        self.logger.info(f"Registered expert: {expert_name}")
+        self.logger.info("Registered expert: %s", expert_name)
+    
+    def register_lazy_expert(self, expert_name: str, module_name: str) -> None:
+        """Register an expert class by name, importing its module only when the class is first needed"""
+        self._experts[expert_name] = module_name
+        self.logger.info("Registered expert: %s", expert_name)
     
     def get_expert_class(self, expert_name: str) -> Optional[Type[BaseExpert]]:
         """Get expert class by name"""
-        return self._experts.get(expert_name)
+        expert_class = self._experts.get(expert_name)
+        if isinstance(expert_class, str):
+            expert_class = getattr(importlib.import_module(expert_class), expert_name)
+            self._experts[expert_name] = expert_class
+        return expert_class
     
     def get_all_expert_names(self) -> List[str]:
         """Get all registered expert names"""
         return list(self._experts.keys())
+    
+    def copy(self) -> "ExpertRegistry":
+        """Get a new registry with the same experts"""
+        registry = ExpertRegistry()
+        registry._experts = dict(self._experts)
+        return registry
+
+
+# Default expert registry and compiled graphs, shared by all runners and built on first use
+_DEFAULT_REGISTRY: Optional[ExpertRegistry] = None
+_GRAPH_SINGLETON = None
+_CHECKPOINTED_GRAPH_SINGLETON = None
 
 
 class ExpertRunner:
     """Main expert runner that manages expert execution using LangGraph"""
     
-    def __init__(self,request= None, correlation_id: Optional[str] = None):
+    def __init__(self,request= None, correlation_id: Optional[str] = None, max_concurrency: int = 5,
+                 enable_checkpointing: bool = False):
         self.correlation_id = correlation_id
-        self.registry = ExpertRegistry()
+        # Checkpointing is only needed to resume or inspect a run; it persists the state at every node
+        self.enable_checkpointing = enable_checkpointing
+        # Caps concurrent expert LLM calls to stay within provider rate limits
+        self._semaphore = asyncio.Semaphore(max_concurrency)
         self.logger = LoggerFactory.get_logger("ExpertRunner", correlation_id)
-        self.memory = MemorySaver()
-        self._setup_default_experts()
         self.request = request
-        self.graph = self._build_expert_graph()
-        dev_draw_mermaid(self.graph, prefix="expert_runner_")
+        self.registry = self._default_registry()
+        self.graph = self._shared_graph()
         self.logger.info("Expert runner initialized with graph-based execution")
 
-    def _setup_default_experts(self):
-        """Setup default experts"""
-        from agentic_workflow.experts.business_strategist import BusinessStrategistExpert
-        from agentic_workflow.experts.market_analyst import MarketAnalystExpert
-        from agentic_workflow.experts.financial_advisor import FinancialAdvisorExpert
-        from agentic_workflow.experts.legal_advisor import LegalAdvisorExpert
-        from agentic_workflow.experts.technical_advisor import TechnicalAdvisorExpert
-        
-        self.registry.register_expert(BusinessStrategistExpert)
-        self.registry.register_expert(MarketAnalystExpert)
-        self.registry.register_expert(FinancialAdvisorExpert)
-        self.registry.register_expert(LegalAdvisorExpert)
-        self.registry.register_expert(TechnicalAdvisorExpert)
+    @staticmethod
+    def _default_registry() -> ExpertRegistry:
+        """Get the registry of default experts, creating it on first use only"""
+        global _DEFAULT_REGISTRY
+        if _DEFAULT_REGISTRY is None:
+            registry = ExpertRegistry()
+            ExpertRunner._setup_default_experts(registry)
+            _DEFAULT_REGISTRY = registry
+        return _DEFAULT_REGISTRY
+
+    def _shared_graph(self):
+        """Get the compiled graph for the default experts, building it on first use only"""
+        global _GRAPH_SINGLETON, _CHECKPOINTED_GRAPH_SINGLETON
+        if self.enable_checkpointing:
+            if _CHECKPOINTED_GRAPH_SINGLETON is None:
+                _CHECKPOINTED_GRAPH_SINGLETON = self._build_expert_graph(checkpointer=MemorySaver())
+            return _CHECKPOINTED_GRAPH_SINGLETON
+        
+        if _GRAPH_SINGLETON is None:
+            _GRAPH_SINGLETON = self._build_expert_graph()
+            if os.getenv("DRAW_MERMAID"):
+                dev_draw_mermaid(_GRAPH_SINGLETON, prefix="expert_runner_")
+        return _GRAPH_SINGLETON
+
+    @staticmethod
+    def _setup_default_experts(registry: ExpertRegistry):
+        """Setup default experts, deferring their imports until each is first used"""
+        registry.register_lazy_expert("BusinessStrategistExpert", "agentic_workflow.experts.business_strategist")
+        registry.register_lazy_expert("MarketAnalystExpert", "agentic_workflow.experts.market_analyst")
+        registry.register_lazy_expert("FinancialAdvisorExpert", "agentic_workflow.experts.financial_advisor")
+        registry.register_lazy_expert("LegalAdvisorExpert", "agentic_workflow.experts.legal_advisor")
+        registry.register_lazy_expert("TechnicalAdvisorExpert", "agentic_workflow.experts.technical_advisor")
     
     def register_custom_expert(self, expert_class: Type[BaseExpert]) -> None:
-        """Register a custom expert"""
+        """Register a custom expert on this runner only, leaving the shared registry and graph untouched"""
+        if self.registry is _DEFAULT_REGISTRY:
+            self.registry = self.registry.copy()
         self.registry.register_expert(expert_class)
-        self.logger.info(f"Registered custom expert: {expert_class.__name__}")
+        self.graph = self._build_expert_graph(checkpointer=MemorySaver() if self.enable_checkpointing else None)
+        self.logger.info("Registered custom expert: %s", expert_class.__name__)
     
-    def _build_expert_graph(self) -> StateGraph:
-        """Build the expert execution graph with parallel expert nodes"""
+    @staticmethod
+    def _runner(config: RunnableConfig) -> "ExpertRunner":
+        """Get the runner that invoked the graph, which holds the per-request state"""
+        return config["configurable"]["runner"]
+    
+    def _build_expert_graph(self, checkpointer: Optional[MemorySaver] = None) -> StateGraph:
+        """
+        Build the expert execution graph with parallel expert nodes.
+        The compiled graph is shared across runners, so nodes act on the runner passed in the config.
+        """
+        
+        async def pre_node(state: ExpertRunnerState, config: RunnableConfig) -> ExpertRunnerState:
+            return await self._runner(config)._pre_node(state)
+        
+        def post_node(state: ExpertRunnerState, config: RunnableConfig) -> ExpertRunnerState:
+            return self._runner(config)._post_node(state)
         
         # Create the state graph
         graph = StateGraph(ExpertRunnerState)
         
         # Add pre-processing node
-        graph.add_node("pre_node", self._pre_node)
+        graph.add_node("pre_node", pre_node)
         
         # Add expert nodes dynamically
         expert_names = self.registry.get_all_expert_names()
@@ -176,7 +350,7 @@ class ExpertRunner:
             graph.add_node(f"expert_{expert_name}", self._create_expert_node(expert_name))
         
         # Add post-processing node
-        graph.add_node("post_node", self._post_node)
+        graph.add_node("post_node", post_node)
         
         # Define the workflow edges
         graph.set_entry_point("pre_node")
@@ -192,89 +366,104 @@ class ExpertRunner:
         # Connect post_node to END
         graph.add_edge("post_node", END)
         
-        return graph.compile(checkpointer=self.memory)
+        return graph.compile(checkpointer=checkpointer)
     
-    def _pre_node(self, state: ExpertRunnerState) -> ExpertRunnerState:
+    async def _pre_node(self, state: ExpertRunnerState) -> ExpertRunnerState:
         """Pre-processing node for expert execution"""
-        self.logger.info(f"Starting expert execution for request...")
+        self.logger.info("Starting expert execution for request...")
         state.metadata["pre_processing_completed"] = True
         state.metadata["expert_count"] = len(self.registry.get_all_expert_names())
+        state.metadata["opt_in_decisions"] = await self._batch_opt_in(self.request.user_context.prompt)
         return state
     
+    async def _batch_opt_in(self, user_prompt: str, expert_names: Optional[List[str]] = None) -> Dict[str, bool]:
+        """Decide which experts should answer with one LLM call, keyed by registered expert name"""
+        if expert_names is None:
+            expert_names = self.registry.get_all_expert_names()
+        
+        registered = {}
+        for expert_name in expert_names:
+            expert_class = self.registry.get_expert_class(expert_name)
+            if expert_class:
+                expert = expert_class(correlation_id=self.correlation_id)
+                registered[expert.name] = (expert_name, expert)
+        
+        experts = [(expert.name, expert.description) for _, expert in registered.values()]
+        decisions = await ExpertDecision.amake_batch_decision(user_prompt, experts, self.correlation_id)
+        
+        # Experts the routing response left out decide individually, all at once rather than one by one
+        missing = [name for name in registered if name not in decisions]
+        if missing:
+            results = await asyncio.gather(*(registered[name][1].aopt_in(user_prompt) for name in missing))
+            decisions.update(zip(missing, results))
+        
+        return {registered[name][0]: decision for name, decision in decisions.items()}
+    
     def _create_expert_node(self, expert_name: str):
         """Create a node function for a specific expert"""
-        def expert_node(state: ExpertRunnerState) -> ExpertRunnerState:
-            return self._execute_expert(expert_name, state)
+        async def expert_node(state: ExpertRunnerState, config: RunnableConfig) -> Dict[str, Any]:
+            expert_response = await self._runner(config)._execute_expert_async(expert_name, state)
+            return {"expert_responses": {expert_name: expert_response}}
         return expert_node
     
-    def _execute_expert(self, expert_name: str, state: ExpertRunnerState) -> ExpertRunnerState:
-        """Execute a specific expert and update the state"""
-        try:
-            # Create expert instance
-            expert_class = self.registry.get_expert_class(expert_name)
-            if not expert_class:
-                self.logger.error(f"Expert class not found: {expert_name}")
-                expert_response = ExpertResponse(
+    async def _execute_expert_async(self, expert_name: str, state: ExpertRunnerState) -> ExpertResponse:
+        """Execute a specific expert without blocking the event loop"""
+        async with self._semaphore:
+            try:
+                # Create expert instance
+                expert_class = self.registry.get_expert_class(expert_name)
+                if not expert_class:
+                    self.logger.error("Expert class not found: %s", expert_name)
+                    return ExpertResponse(
+                        name=expert_name,
+                        opt_in=False,
+                        error=f"Expert class not found: {expert_name}",
+                        status=ExpertStatus.FAILED
+                    )
+                
+                expert = expert_class(correlation_id=self.correlation_id)
+                
+                # Use the batched opt-in decision, asking the expert directly only if it is missing
+                should_answer = state.metadata.get("opt_in_decisions", {}).get(expert_name)
+                if should_answer is None:
+                    should_answer = await expert.aopt_in(self.request.user_context.prompt)
+                
+                if not should_answer:
+                    self.logger.info("Expert %s opted out", expert_name)
+                    return ExpertResponse(
+                        name=expert_name,
+                        opt_in=False,
+                        status=ExpertStatus.OPTED_OUT
+                    )
+                
+                # Execute expert if opted in
+                start_time = time.perf_counter()
+                response = await expert.arun_cached(self.request.user_context.prompt)
+                execution_time = time.perf_counter() - start_time
+                
+                self.logger.info("Expert %s completed in %.2fs", expert_name, execution_time)
+                
+                return ExpertResponse(
                     name=expert_name,
-                    opt_in="no",
-                    error=f"Expert class not found: {expert_name}",
-                    status=ExpertStatus.FAILED
+                    response=response,
+                    opt_in=True,
+                    execution_time=execution_time,
+                    status=ExpertStatus.COMPLETED,
+                    metadata={"completed_at": datetime.now(timezone.utc).isoformat()}
                 )
-                state.expert_responses[expert_name] = expert_response
-                return state
-            
-            expert = expert_class(correlation_id=self.correlation_id)
-            
-            # Check if expert should opt-in
-            should_answer = expert.opt_in(self.request.user_context.prompt)
-            
-            if not should_answer:
-                expert_response = ExpertResponse(
+                
+            except Exception as e:
+                self.logger.error("Expert %s failed: %s", expert_name, e)
+                return ExpertResponse(
                     name=expert_name,
-                    opt_in="no",
-                    status=ExpertStatus.OPTED_OUT
+                    opt_in=False,
+                    error=str(e),
+                    status=ExpertStatus.FAILED
                 )
-                state.expert_responses[expert_name] = expert_response
-                self.logger.info(f"Expert {expert_name} opted out")
-                return state
-            
-            # Execute expert if opted in
-            start_time = datetime.now(timezone.utc)
-            response = expert.run(self.request.user_context.prompt)
-            end_time = datetime.now(timezone.utc)
-            
-            # Update execution time
-            execution_time = (end_time - start_time).total_seconds()
-            
-            # Create expert response
-            expert_response = ExpertResponse(
-                name=expert_name,
-                response=response,
-                opt_in="yes",
-                execution_time=execution_time,
-                status=ExpertStatus.COMPLETED,
-                metadata={"completed_at": end_time.isoformat()}
-            )
-            
-            state.expert_responses[expert_name] = expert_response
-            
-            self.logger.info(f"Expert {expert_name} completed in {execution_time:.2f}s")
-            
-        except Exception as e:
-            self.logger.error(f"Expert {expert_name} failed: {str(e)}")
-            expert_response = ExpertResponse(
-                name=expert_name,
-                opt_in="no",
-                error=str(e),
-                status=ExpertStatus.FAILED
-            )
-            state.expert_responses[expert_name] = expert_response
-        
-        return state
     
     def _post_node(self, state: ExpertRunnerState) -> ExpertRunnerState:
         """Post-processing node to collect and summarize expert responses"""
-        self.logger.info(f"Expert execution completed for {len(state.expert_responses)} experts")
+        self.logger.info("Expert execution completed for %s experts", len(state.expert_responses))
         
         # Update metadata
         state.metadata["post_processing_completed"] = True
@@ -286,7 +475,7 @@ class ExpertRunner:
     async def run_experts(self, user_prompt: str, user_context: Dict[str, Any], 
                          expert_names: Optional[List[str]] = None) -> Dict[str, ExpertResponse]:
         """Run experts using the graph-based approach"""
-        self.logger.info(f"Starting graph-based expert execution")
+        self.logger.info("Starting graph-based expert execution")
 
         # Use all experts if none specified
         if expert_names is None:
@@ -297,21 +486,24 @@ class ExpertRunner:
         
         try:
             # Run the graph
-            final_state = await self.graph.ainvoke(initial_state)
-            final_reponse = {}
-            for expert,response in final_state.get('expert_responses',{}).items():
-                if response.opt_in in ['yes','Yes','YES','true','True',True]:
-                    final_reponse[expert] = {
-                        'name': expert,
-                        'response': response.response,
-                        'error': response.error,
-                        'execution_time': response.execution_time,
-                        'status': response.status.value,
-                    }
-            return final_reponse
+            configurable = {"runner": self}
+            if self.enable_checkpointing:
+                configurable["thread_id"] = self.request.metadata.request_id if self.request else self.correlation_id
+            final_state = await self.graph.ainvoke(initial_state, config={"configurable": configurable})
+            return {
+                expert: {
+                    'name': expert,
+                    'response': response.response,
+                    'error': response.error,
+                    'execution_time': response.execution_time,
+                    'status': response.status.value,
+                }
+                for expert, response in final_state.get('expert_responses', {}).items()
+                if response.opt_in
+            }
             
         except Exception as e:
-            self.logger.error(f"Failed to run experts: {str(e)}")
+            self.logger.error("Failed to run experts: %s", e)
             # Return error responses for all experts
             error_responses = {}
             for expert_name in expert_names:
@@ -322,6 +514,124 @@ class ExpertRunner:
                 )
             return error_responses
     
+    async def stream_experts(self, user_prompt: str,
+                             expert_names: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream expert responses as they are generated
+        
+        Every expert runs concurrently and its chunks are merged into a single
+        stream. Each event is tagged with the expert name and carries either a
+        "delta" text chunk or a final "status" (plus "error" on failure).
+        Use format_sse() to send the events to a client as Server-Sent Events.
+        """
+        self.logger.info("Starting streaming expert execution")
+        
+        # Use all experts if none specified
+        if expert_names is None:
+            expert_names = self.registry.get_all_expert_names()
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        decisions = await self._batch_opt_in(user_prompt, expert_names)
+        
+        async def produce(expert_name: str):
+            async with self._semaphore:
+                try:
+                    expert_class = self.registry.get_expert_class(expert_name)
+                    if not expert_class:
+                        raise ValueError(f"Expert class not found: {expert_name}")
+                    
+                    expert = expert_class(correlation_id=self.correlation_id)
+                    should_answer = decisions.get(expert_name)
+                    if should_answer is None:
+                        should_answer = await expert.aopt_in(user_prompt)
+                    if not should_answer:
+                        await queue.put({"expert": expert_name, "status": ExpertStatus.OPTED_OUT.value})
+                        return
+                    
+                    async for delta in expert.stream(user_prompt):
+                        await queue.put({"expert": expert_name, "delta": delta})
+                    await queue.put({"expert": expert_name, "status": ExpertStatus.COMPLETED.value})
+                    
+                except Exception as e:
+                    self.logger.error("Expert %s stream failed: %s", expert_name, e)
+                    await queue.put({"expert": expert_name, "status": ExpertStatus.FAILED.value, "error": str(e)})
+        
+        tasks = [asyncio.create_task(produce(expert_name)) for expert_name in expert_names]
+        pending = len(tasks)
+        try:
+            while pending:
+                event = await queue.get()
+                if "status" in event:
+                    pending -= 1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def run_experts_batch(self, requests: List[Any], batch_client: Optional[BatchLLMClient] = None,
+                                expert_names: Optional[List[str]] = None) -> Dict[str, Dict[str, ExpertResponse]]:
+        """
+        Run experts over many requests through the provider batch endpoint (offline workloads only)
+        
+        Every expert answers every request without an opt-in decision, so N
+        requests with 5 experts become one batch job of 5N completions.
+        Experts without a STATIC_PREFIX cannot be batched and run online.
+        
+        Args:
+            requests: AnnaRequest objects to answer
+            batch_client: Batch client to submit through (a default one is created if omitted)
+            expert_names: Experts to run (all registered experts if omitted)
+            
+        Returns:
+            Dictionary of request ID to {expert name: ExpertResponse}
+        """
+        self.logger.info("Starting batch expert execution for %s requests", len(requests))
+        
+        if batch_client is None:
+            batch_client = BatchLLMClient()
+        if expert_names is None:
+            expert_names = self.registry.get_all_expert_names()
+        
+        experts = {}
+        for name in expert_names:
+            expert_class = self.registry.get_expert_class(name)
+            if not expert_class:
+                self.logger.warning("Expert class not found: %s", name)
+                continue
+            experts[name] = expert_class(correlation_id=self.correlation_id)
+
+        jobs = []
+        for request in requests:
+            request_id = request.metadata.request_id
+            user_prompt = request.user_context.prompt
+            for expert_name, expert in experts.items():
+                if expert.STATIC_PREFIX is None:
+                    job = asyncio.ensure_future(expert.arun_cached(user_prompt))
+                else:
+                    messages = [{"role": "user", "content": expert.build_prompt(user_prompt)}]
+                    if expert.SYSTEM_PROMPT:
+                        messages.insert(0, {"role": "system", "content": expert.SYSTEM_PROMPT})
+                    job = batch_client.submit(f"{request_id}:{expert_name}", messages)
+                jobs.append((request_id, expert_name, job))
+        
+        # Everything is queued, so send the remainder without waiting for the window
+        batch_client.flush()
+        
+        outcomes = await asyncio.gather(*(job for _, _, job in jobs), return_exceptions=True)
+        
+        results: Dict[str, Dict[str, ExpertResponse]] = {}
+        for (request_id, expert_name, _), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error("Expert %s failed for request %s: %s", expert_name, request_id, outcome)
+                expert_response = ExpertResponse(name=expert_name, opt_in=False, error=str(outcome),
+                                                 status=ExpertStatus.FAILED)
+            else:
+                expert_response = ExpertResponse(name=expert_name, response=outcome, opt_in=True,
+                                                 status=ExpertStatus.COMPLETED)
+            results.setdefault(request_id, {})[expert_name] = expert_response
+        
+        return results
+    
     def get_available_experts(self) -> List[str]:
         """Get list of available experts"""
         return self.registry.get_all_expert_names()
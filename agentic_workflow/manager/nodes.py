@@ -3,37 +3,148 @@ Anna AI Coach Workflow Nodes
 Individual node implementations for the LangGraph workflow
 """
 
-from typing import Dict, Any, List
-import json
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Any, List, Mapping, Optional
+from types import MappingProxyType
+from string import Template
+import asyncio
+import copy
+from collections import deque
+from contextvars import ContextVar
+import orjson
+import os
+import random
 import logging
+from pydantic import BaseModel
 from datetime import datetime, timezone
-import traceback
+import time
 from abc import ABC, abstractmethod
 
-from ..resource import AnnaLLMRegistry, LoggerFactory
-from .workflow import WorkflowState
+from ..resource import AnnaLLMRegistry, LoggerFactory, LLMCache, ContextStore
+
+if TYPE_CHECKING:
+    # workflow.py imports this module, so WorkflowState is only imported for annotations
+    from .workflow import WorkflowState
+
+
+# Number of past turns kept per session; older turns are dropped as new ones arrive
+MAX_CONVERSATION_HISTORY = 50
+
+# Seconds a session's context is kept after its last update
+CONTEXT_TTL = 86400
+
+# Prompt templates for the summarizer and follow-up nodes, parsed once at import time
+_SUMMARY_TEMPLATE = Template("""You are Anna, an AI coach for entrepreneurs. Summarize and synthesize the following expert responses into a cohesive, actionable response.
+
+Original Question: $question
+
+Expert Responses:
+$responses
+
+Provide a comprehensive summary that:
+1. Addresses the user's question directly
+2. Combines the best insights from all experts
+3. Provides clear, actionable steps
+4. Maintains a supportive and encouraging tone
+5. Is well-structured and easy to follow
+""")
+
+_FOLLOWUP_TEMPLATE = Template("""Based on the user's question and the response provided, generate 3 relevant follow-up questions that would help the user further.
+
+Original Question: $question
+Response: $response
+
+Generate follow-up questions that:
+1. Are specific and actionable
+2. Help the user dive deeper into the topic
+3. Address potential next steps
+4. Are relevant to their business context
+
+Return them in the 'questions' list, each with a 'question' and a 'category'.
+""")
+
+# Expert-specific system prompts for the legacy ExpertRunnerNode, built once at import time
+_EXPERT_SYSTEM_PROMPTS: Mapping[str, str] = MappingProxyType({
+    "business_strategist": """You are a business strategy expert. Provide actionable business advice for entrepreneurs.
+
+Provide a structured response with:
+1. Key insights
+2. Actionable steps
+3. Potential challenges
+4. Success metrics""",
+    
+    "motivation_coach": """You are a motivational coach for entrepreneurs. Provide encouragement and motivation.
+
+Provide a response that:
+1. Acknowledges their situation
+2. Offers encouragement
+3. Shares relevant success stories
+4. Provides actionable motivation""",
+    
+    "market_analyst": """You are a market analysis expert. Provide insights on market research and analysis.
+
+Provide analysis covering:
+1. Market size and opportunity
+2. Competitive landscape
+3. Target audience insights
+4. Market entry strategies""",
+    
+    "general_advisor": """You are Anna, an AI coach for entrepreneurs. Provide helpful and actionable advice.
+
+Provide comprehensive advice that is:
+1. Practical and actionable
+2. Based on entrepreneurial best practices
+3. Encouraging and supportive
+4. Tailored to their specific situation"""
+})
+
+# Correlation ID of the request a node is running for; set by BaseNode.run so shared node instances log per request
+_CORRELATION_ID: ContextVar[Optional[str]] = ContextVar("anna_node_correlation_id", default=None)
+
+# Summary used when no expert responded
+_NO_ADVICE_SUMMARY = "I'm unable to provide advice at the moment."
+
+# Follow-up questions used when generation is skipped or fails; copied into the state as plain dicts
+_STATIC_FALLBACK = (
+    MappingProxyType({"question": "Would you like me to elaborate on any specific aspect?", "category": "clarification"}),
+    MappingProxyType({"question": "What's your next immediate step?", "category": "action_planning"}),
+    MappingProxyType({"question": "Do you have any concerns about implementing this advice?", "category": "concerns"}),
+)
 
 
 class BaseNode(ABC):
     """Base class for all workflow nodes"""
     
-    def __init__(self, correlation_id: str = None):
+    # Node instances are shared by all requests (see get_node) and hold no per-request state;
+    # subclasses declare __slots__ too so nothing request-specific can be set on them by accident
+    __slots__ = ("llm",)
+    
+    # Fraction of node errors logged with a state snapshot; the rest log without it
+    _error_sample_rate = float(os.getenv("ANNA_ERROR_SNAPSHOT_SAMPLE_RATE", "1.0"))
+    
+    # Exact-match cache of LLM-generated node outputs, shared by all nodes; only deterministic
+    # (temperature 0) outputs are cached, since a sampled output should not be replayed to other users
+    _response_cache = LLMCache(maxsize=1024, ttl=3600)
+    
+    def __init__(self):
         self.llm = AnnaLLMRegistry().get_coaching_llm()
-        self.correlation_id = correlation_id
-        self.logger = LoggerFactory.get_node_logger(
-            self.__class__.__name__, 
-            correlation_id=correlation_id
-        )
     
-    async def run(self, state: WorkflowState) -> WorkflowState:
+    @property
+    def correlation_id(self) -> Optional[str]:
+        """Correlation ID of the request this node is currently running for"""
+        return _CORRELATION_ID.get()
+    
+    @property
+    def logger(self):
+        """Node logger for the current request (LoggerFactory caches one per correlation ID)"""
+        return LoggerFactory.get_node_logger(self.__class__.__name__, correlation_id=_CORRELATION_ID.get())
+    
+    async def run(self, state: WorkflowState, correlation_id: Optional[str] = None) -> WorkflowState:
         """Run the node logic"""
-        # Update logger with state information if not already set
-        if not self.correlation_id and hasattr(state, 'request'):
-            self.correlation_id = state.request.user_context.correlation_id
-            self.logger = LoggerFactory.get_node_logger(
-                self.__class__.__name__, 
-                correlation_id=self.correlation_id
-            )
+        if correlation_id is None and hasattr(state, 'request'):
+            correlation_id = state.request.user_context.correlation_id
+        token = _CORRELATION_ID.set(correlation_id)
         
         try:
             self.logger.log_workflow_step(self.__class__.__name__, "started")
@@ -41,13 +152,28 @@ class BaseNode(ABC):
             self.logger.log_workflow_step(self.__class__.__name__, "completed")
             return result
         except Exception as e:
-            self.logger.error(f"Error in {self.__class__.__name__}: {e}", {
-                "state_snapshot": state.to_dict(),
-                "error_type": type(e).__name__,
-                "error_message": str(e),
-                "traceback": traceback.format_exc()
-            })
+            # The state snapshot is costly to build, so skip it when ERROR is filtered out
+            if self.logger.isEnabledFor(logging.ERROR):
+                if random.random() < self._error_sample_rate:
+                    state_snapshot = state.to_dict(shallow=True)
+                else:
+                    state_snapshot = {"omitted": True}
+                self.logger.error("Error in %s: %s", self.__class__.__name__, e, extra_data={
+                    "state_snapshot": state_snapshot,
+                    "error_type": type(e).__name__,
+                    "error_message": str(e)
+                }, exc_info=True)
             raise
+        finally:
+            _CORRELATION_ID.reset(token)
+
+    def _response_cache_key(self, prompt: str, system: str = "", json_output: bool = False) -> Optional[str]:
+        """Cache key for this node's LLM output on a prompt, or None if the LLM samples at temperature > 0"""
+        if self.llm.temperature != 0:
+            return None
+        return LLMCache.cache_key(
+            self.__class__.__name__, self.llm.model_name, str(self.llm.temperature), str(json_output), system, prompt
+        )
 
     @abstractmethod
     async def _process(self, state: WorkflowState) -> WorkflowState:
@@ -57,17 +183,19 @@ class BaseNode(ABC):
 class PreNode(BaseNode):
     """Pre-processing node - logs request and prepares for processing"""
     
+    __slots__ = ()
+    
     async def _process(self, state: WorkflowState) -> WorkflowState:
         """Pre-process the request"""
         # Log the incoming request
-        self.logger.info(f"Processing request: {state.request.user_context.user_id}")
+        self.logger.info("Processing request: %s", state.request.user_context.user_id)
         
         # Add request metadata to state
         state.user_context["request_timestamp"] = datetime.now(timezone.utc).isoformat()
         state.user_context["request_id"] = state.workflow_id
         
         # Check if request needs special handling
-        if state.request.user_context.prompt.lower().startswith("urgent"):
+        if state.request.user_context.prompt[:6].lower() == "urgent":
             state.user_context["priority"] = "high"
         
         return state
@@ -76,26 +204,30 @@ class PreNode(BaseNode):
 class PreTranslationNode(BaseNode):
     """Pre-translation node - detects language and translates if needed"""
     
+    __slots__ = ()
+    
     async def _process(self, state: WorkflowState) -> WorkflowState:
         """Handle pre-translation logic"""
         user_prompt = state.request.user_context.prompt
         target_lang = state.request.language
         
         # Simple language detection (in production, use a proper language detection service)
-        if self._detect_language(user_prompt) != target_lang:
+        detected = self._detect_language(user_prompt)
+        if detected != target_lang:
             state.needs_translation = True
-            state.source_language = self._detect_language(user_prompt)
+            state.source_language = detected
             state.target_language = target_lang
             
             # Translate the user prompt
             translated_prompt = self._translate_text(user_prompt, state.source_language, state.target_language)
             state.request.user_context.prompt = translated_prompt
             
-            self.logger.info(f"Translated from {state.source_language} to {state.target_language}")
+            self.logger.info("Translated from %s to %s", state.source_language, state.target_language)
         
         return state
     
-    def _detect_language(self, text: str) -> str:
+    @staticmethod
+    def _detect_language(text: str) -> str:
         """Simple language detection (placeholder)"""
         # In production, use a proper language detection service
         # For now, assume English
@@ -111,8 +243,10 @@ class PreTranslationNode(BaseNode):
 class ContextManagementNode(BaseNode):
     """Context management node - retrieves and enriches user context"""
     
-    def __init__(self, context_store: Dict[str, Any], correlation_id: str = None):
-        super().__init__(correlation_id=correlation_id)
+    __slots__ = ("context_store",)
+    
+    def __init__(self, context_store: ContextStore):
+        super().__init__()
         self.context_store = context_store
     
     async def _process(self, state: WorkflowState) -> WorkflowState:
@@ -121,23 +255,29 @@ class ContextManagementNode(BaseNode):
         session_id = state.request.user_context.session_id
         
         # Get existing context
-        context_key = f"{user_id}_{session_id}"
-        existing_context = self.context_store.get(context_key, {})
+        context_key = (user_id, session_id)
+        existing_context = await self.context_store.get(context_key) or {}
+        now_iso = datetime.now(timezone.utc).isoformat()
+        
+        # Bounded history; contexts stored before the cap hold a plain list
+        history = existing_context.get("conversation_history")
+        if not isinstance(history, deque):
+            history = deque(history or [], maxlen=MAX_CONVERSATION_HISTORY)
         
         # Enrich context with current request
         enriched_context = {
             "user_id": user_id,
             "session_id": session_id,
-            "last_interaction": datetime.now(timezone.utc).isoformat(),
+            "last_interaction": now_iso,
             "interaction_count": existing_context.get("interaction_count", 0) + 1,
             "preferences": existing_context.get("preferences", {}),
             "business_context": existing_context.get("business_context", {}),
-            "conversation_history": existing_context.get("conversation_history", [])
+            "conversation_history": history
         }
         
         # Add current interaction to history
-        enriched_context["conversation_history"].append({
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+        history.append({
+            "timestamp": now_iso,
             "prompt": state.request.user_context.prompt,
             "scope": state.request.scope
         })
@@ -148,53 +288,39 @@ class ContextManagementNode(BaseNode):
         return state
 
     
-    def ExpertRunnerNode(self, expert: str, state: WorkflowState) -> Dict[str, Any]:
+    async def run_experts(self, experts: List[str], state: WorkflowState,
+                          max_parallel_experts: int = 5) -> List[Any]:
+        """
+        Run several experts concurrently with the legacy ExpertRunnerNode
+        
+        Args:
+            experts: Expert names to run
+            state: Current workflow state
+            max_parallel_experts: Maximum number of concurrent LLM calls
+            
+        Returns:
+            One result per expert, in order; a failed expert yields its exception
+        """
+        semaphore = asyncio.Semaphore(max_parallel_experts)
+        
+        async def run_one(expert: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.ExpertRunnerNode(expert, state)
+        
+        tasks = [asyncio.create_task(run_one(expert)) for expert in experts]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def ExpertRunnerNode(self, expert: str, state: WorkflowState) -> Dict[str, Any]:
         """Fallback method to run a specific expert (legacy implementation)"""
-        import time
         start_time = time.time()
         
         prompt = state.request.user_context.prompt
         context = state.user_context
         
-        # Expert-specific system prompts
-        expert_system_prompts = {
-            "business_strategist": """You are a business strategy expert. Provide actionable business advice for entrepreneurs.
-
-Provide a structured response with:
-1. Key insights
-2. Actionable steps
-3. Potential challenges
-4. Success metrics""",
-            
-            "motivation_coach": """You are a motivational coach for entrepreneurs. Provide encouragement and motivation.
-
-Provide a response that:
-1. Acknowledges their situation
-2. Offers encouragement
-3. Shares relevant success stories
-4. Provides actionable motivation""",
-            
-            "market_analyst": """You are a market analysis expert. Provide insights on market research and analysis.
-
-Provide analysis covering:
-1. Market size and opportunity
-2. Competitive landscape
-3. Target audience insights
-4. Market entry strategies""",
-            
-            "general_advisor": """You are Anna, an AI coach for entrepreneurs. Provide helpful and actionable advice.
-
-Provide comprehensive advice that is:
-1. Practical and actionable
-2. Based on entrepreneurial best practices
-3. Encouraging and supportive
-4. Tailored to their specific situation"""
-        }
-        
-        system_prompt = expert_system_prompts.get(expert, expert_system_prompts["general_advisor"])
+        system_prompt = _EXPERT_SYSTEM_PROMPTS.get(expert, _EXPERT_SYSTEM_PROMPTS["general_advisor"])
         
         try:
-            response = self.llm.quick_prompt(prompt, system=system_prompt)
+            response = await self.llm.quick_prompt_async(prompt, system=system_prompt)
             
             # Handle different response formats
             if hasattr(response, 'content'):
@@ -226,7 +352,7 @@ Provide comprehensive advice that is:
             
         except Exception as e:
             duration = time.time() - start_time
-            self.logger.error(f"Expert {expert} failed: {str(e)}", {
+            self.logger.error("Expert %s failed: %s", expert, e, extra_data={
                 "expert": expert,
                 "prompt": prompt,
                 "duration": duration,
@@ -238,93 +364,105 @@ Provide comprehensive advice that is:
 class SummarizerNode(BaseNode):
     """Summarizer node - consolidates expert responses"""
     
+    __slots__ = ()
+    
     async def _process(self, state: WorkflowState) -> WorkflowState:
         """Summarize expert responses"""
         if not state.expert_responses:
-            state.summary = "I'm unable to provide advice at the moment."
+            state.summary = _NO_ADVICE_SUMMARY
             return state
         
         # Create summary prompt
-        expert_responses_text = "\n\n".join([
+        expert_responses_text = "\n\n".join(
             f"Expert {expert}: {response.get('expert_response', 'No response')}"
             for expert, response in state.expert_responses.items()
-        ])
-        
-        summary_prompt = f"""
-        You are Anna, an AI coach for entrepreneurs. Summarize and synthesize the following expert responses into a cohesive, actionable response.
-        
-        Original Question: {state.request.user_context.prompt}
-        
-        Expert Responses:
-        {expert_responses_text}
-        
-        Provide a comprehensive summary that:
-        1. Addresses the user's question directly
-        2. Combines the best insights from all experts
-        3. Provides clear, actionable steps
-        4. Maintains a supportive and encouraging tone
-        5. Is well-structured and easy to follow
-        """
+        )
         
-        response = self.llm.quick_prompt(summary_prompt)
+        summary_prompt = _SUMMARY_TEMPLATE.substitute(
+            question=state.request.user_context.prompt,
+            responses=expert_responses_text
+        )
         
-        # Handle different response formats
-        if hasattr(response, 'content'):
-            state.summary = response.content
-        elif isinstance(response, dict):
-            state.summary = response.get('content', str(response))
-        else:
-            state.summary = str(response)
+        cache_key = self._response_cache_key(summary_prompt)
+        summary = self._response_cache.get(cache_key) if cache_key else None
+        if summary is None:
+            response = await self.llm.quick_prompt_async(summary_prompt)
+            
+            # Handle different response formats
+            if hasattr(response, 'content'):
+                summary = response.content
+            elif isinstance(response, dict):
+                summary = response.get('content', str(response))
+            else:
+                summary = str(response)
+            if cache_key:
+                self._response_cache.set(cache_key, summary)
         
+        state.summary = summary
         return state
 
 
+class FollowupItem(BaseModel):
+    """A single generated follow-up question"""
+    question: str
+    category: str
+
+
+class FollowupQuestions(BaseModel):
+    """Structured output schema for FollowupQuestionNode"""
+    questions: List[FollowupItem]
+
+
 class FollowupQuestionNode(BaseNode):
     """Follow-up question node - generates relevant follow-up questions"""
     
+    __slots__ = ()
+    
     async def _process(self, state: WorkflowState) -> WorkflowState:
         """Generate follow-up questions"""
         if not state.summary:
             state.followup_questions = []
             return state
         
-        followup_prompt = f"""
-        Based on the user's question and the response provided, generate 3 relevant follow-up questions that would help the user further.
-        
-        Original Question: {state.request.user_context.prompt}
-        Response: {state.summary}
-        
-        Generate follow-up questions that:
-        1. Are specific and actionable
-        2. Help the user dive deeper into the topic
-        3. Address potential next steps
-        4. Are relevant to their business context
+        # Follow-ups to a non-answer are not worth an LLM call
+        if state.summary == _NO_ADVICE_SUMMARY:
+            state.followup_questions = [dict(question) for question in _STATIC_FALLBACK]
+            return state
         
-        Return as JSON array with objects containing 'question' and 'category' fields.
-        """
+        followup_prompt = _FOLLOWUP_TEMPLATE.substitute(
+            question=state.request.user_context.prompt,
+            response=state.summary
+        )
         
         try:
-            response = self.llm.quick_prompt(followup_prompt, json_output=True)
-            if hasattr(response, 'content'):
-                followup_questions = json.loads(response.content)
-            else:
-                followup_questions = response
-            state.followup_questions = followup_questions
+            cache_key = self._response_cache_key(followup_prompt, json_output=True)
+            followup_questions = self._response_cache.get(cache_key) if cache_key else None
+            if followup_questions is None:
+                # The schema constrains decoding, so the response always has the expected shape
+                response = await self.llm.quick_prompt_async(followup_prompt, schema=FollowupQuestions)
+                followup_questions = [item.model_dump() for item in response.questions]
+                if cache_key:
+                    self._response_cache.set(cache_key, followup_questions)
+            # Later nodes edit the questions in place, so never hand out the cached object
+            state.followup_questions = copy.deepcopy(followup_questions)
         except Exception as e:
             # Fallback questions
-            state.followup_questions = [
-                {"question": "Would you like me to elaborate on any specific aspect?", "category": "clarification"},
-                {"question": "What's your next immediate step?", "category": "action_planning"},
-                {"question": "Do you have any concerns about implementing this advice?", "category": "concerns"}
-            ]
-            self.logger.warning(f"Follow-up question generation failed: {e}")
+            state.followup_questions = [dict(question) for question in _STATIC_FALLBACK]
+            self.logger.warning("Follow-up question generation failed: %s", e)
         
         return state
 
 
+def dumps(obj: Any) -> bytes:
+    """Serialize a formatted response (or any workflow output) to JSON bytes"""
+    return orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC)
+
+
 class ResponseFormatterNode(BaseNode):
     """Response formatter node - formats final response"""
     
+    __slots__ = ()
+    
     async def _process(self, state: WorkflowState) -> WorkflowState:
         """Format the final response"""
         formatted_response = {
@@ -336,10 +474,10 @@ class ResponseFormatterNode(BaseNode):
                 "expert_insights": state.expert_responses,
             },
             "metadata": {
-                "processing_time": (datetime.now(timezone.utc) - state.start_time).total_seconds(),
+                "processing_time": time.monotonic() - state.start_monotonic,
                 "language": state.target_language,
                 "needs_translation": state.needs_translation,
-                "processing_steps": state.processing_steps
+                "processing_steps": state.processing_steps or []
             }
         }
         
@@ -350,26 +488,26 @@ class ResponseFormatterNode(BaseNode):
 class ContextUpdateNode(BaseNode):
     """Context update node - updates user context with new information"""
     
-    def __init__(self, context_store: Dict[str, Any], correlation_id: str = None):
-        super().__init__(correlation_id=correlation_id)
+    __slots__ = ("context_store",)
+    
+    def __init__(self, context_store: ContextStore):
+        super().__init__()
         self.context_store = context_store
     
     async def _process(self, state: WorkflowState) -> WorkflowState:
         """Update user context"""
         user_id = state.request.user_context.user_id
         session_id = state.request.user_context.session_id
-        context_key = f"{user_id}_{session_id}"
-        
-        # Update context with new information
-        updated_context = state.user_context.copy()
-        updated_context.update({
-            "last_response": state.summary,
-            "response_timestamp": datetime.now(timezone.utc).isoformat(),
-            "total_interactions": updated_context.get("interaction_count", 0)
-        })
+        context_key = (user_id, session_id)
+        
+        # Update context in place; the store keeps its own snapshot of it
+        user_context = state.user_context
+        user_context["last_response"] = state.summary
+        user_context["response_timestamp"] = datetime.now(timezone.utc).isoformat()
+        user_context["total_interactions"] = user_context.get("interaction_count", 0)
         
         # Store updated context
-        self.context_store[context_key] = updated_context
+        await self.context_store.set(context_key, user_context, ttl=CONTEXT_TTL)
         
         return state
 
@@ -377,62 +515,75 @@ class ContextUpdateNode(BaseNode):
 class PostTranslationNode(BaseNode):
     """Post-translation node - translates response back to user's language"""
     
+    __slots__ = ()
+    
     async def _process(self, state: WorkflowState) -> WorkflowState:
         """Handle post-translation"""
-        if not state.needs_translation:
+        if not state.needs_translation or state.source_language == state.target_language:
+            return state
+        
+        # Translate the summary and all follow-up questions in a single batch
+        questions = [question for question in state.followup_questions if "question" in question]
+        texts = ([state.summary] if state.summary else []) + [question["question"] for question in questions]
+        if not texts:
             return state
         
-        # Translate summary
+        translated = self._translate_texts(texts, state.target_language, state.source_language)
+        
         if state.summary:
-            translated_summary = self._translate_text(
-                state.summary, 
-                state.target_language, 
-                state.source_language
-            )
-            state.summary = translated_summary
-        
-        # Translate follow-up questions
-        if state.followup_questions:
-            for question in state.followup_questions:
-                if "question" in question:
-                    question["question"] = self._translate_text(
-                        question["question"],
-                        state.target_language,
-                        state.source_language
-                    )
+            state.summary = translated[0]
+            translated = translated[1:]
+        for question, translated_question in zip(questions, translated):
+            question["question"] = translated_question
         
         return state
     
-    def _translate_text(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Translate text (placeholder)"""
-        # In production, use a proper translation service
-        # For now, return the original text
-        return text
+    def _translate_texts(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """Translate several texts with one request (placeholder)"""
+        # In production, use a proper translation service's batch endpoint
+        # For now, return the original texts
+        return list(texts)
 
 
 class PostNode(BaseNode):
     """Post-processing node - final processing and logging"""
     
+    __slots__ = ()
+    
     async def _process(self, state: WorkflowState) -> WorkflowState:
         """Post-process the response"""
         # Log successful completion
-        self.logger.info(f"Workflow completed successfully: {state.workflow_id}")
+        self.logger.info("Workflow completed successfully: %s", state.workflow_id)
         
         # Add completion metadata
-        state.user_context["completion_timestamp"] = datetime.now(timezone.utc).isoformat()
-        state.user_context["processing_duration"] = (
-            datetime.now(timezone.utc) - state.start_time
-        ).total_seconds()
+        now_iso = datetime.now(timezone.utc).isoformat()
+        state.user_context["completion_timestamp"] = now_iso
+        state.user_context["processing_duration"] = time.monotonic() - state.start_monotonic
         
         # Update formatted response with final metadata
         if state.formatted_response:
-            state.formatted_response["metadata"]["completion_time"] = datetime.now(timezone.utc).isoformat()
+            state.formatted_response["metadata"]["completion_time"] = now_iso
         
         return state
 
 
+# Stateless nodes shared by all requests, created on first use (see get_node)
+NODE_REGISTRY: Dict[str, BaseNode] = {}
+
+
+def get_node(node_class: type) -> BaseNode:
+    """Get the shared instance of a stateless node class, creating it on first use"""
+    node = NODE_REGISTRY.get(node_class.__name__)
+    if node is None:
+        node = NODE_REGISTRY[node_class.__name__] = node_class()
+    return node
+
+
 # Export all node classes
 __all__ = [
+    'dumps',
+    'NODE_REGISTRY',
+    'get_node',
     'BaseNode',
     'PreNode',
     'PreTranslationNode',
@@ -3,19 +3,34 @@ Anna AI Coach Workflow using LangGraph
 Main workflow orchestration for the Anna AI Coach system
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional
 from dataclasses import dataclass, field
+from collections import deque
 from datetime import datetime, timezone
+import asyncio
+import os
+import time
 import uuid
-import traceback
 
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 
-from ..resource import AnnaRequest, LoggerFactory, dev_draw_mermaid
+from ..resource import AnnaRequest, LoggerFactory, create_context_store, dev_draw_mermaid
+from .nodes import (
+    PreNode,
+    PreTranslationNode,
+    ContextManagementNode,
+    SummarizerNode,
+    FollowupQuestionNode,
+    ResponseFormatterNode,
+    ContextUpdateNode,
+    PostTranslationNode,
+    PostNode,
+    get_node
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkflowState:
     """State object for the Anna workflow"""
     
@@ -42,37 +57,60 @@ class WorkflowState:
     # Metadata
     workflow_id: str = field(default_factory=lambda: str(uuid.uuid4()))
     start_time: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    start_monotonic: float = field(default_factory=time.monotonic)  # For durations; immune to wall-clock jumps
     end_time: Optional[datetime] = None
-    processing_steps: List[str] = field(default_factory=list)
-    errors: List[str] = field(default_factory=list)
-    
-    def add_step(self, step_name: str):
-        """Add a processing step to the workflow"""
-        self.processing_steps.append(f"{step_name}: {datetime.now(timezone.utc).isoformat()}")
-    
-    def add_error(self, error: str):
-        """Add an error to the workflow"""
-        self.errors.append(f"{error}: {datetime.now(timezone.utc).isoformat()}")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert state to dictionary"""
-        return {
-            "workflow_id": self.workflow_id,
-            "request": self.request.to_dict(),
-            "needs_translation": self.needs_translation,
-            "source_language": self.source_language,
-            "target_language": self.target_language,
-            "user_context": self.user_context,
-            "conversation_history": self.conversation_history,
-            "expert_responses": self.expert_responses,
-            "summary": self.summary,
-            "followup_questions": self.followup_questions,
-            "formatted_response": self.formatted_response,
-            "start_time": self.start_time.isoformat(),
-            "end_time": self.end_time.isoformat() if self.end_time else None,
-            "processing_steps": self.processing_steps,
-            "errors": self.errors
-        }
+    # Created by add_step/add_error on first use; most requests record few steps and no errors
+    processing_steps: Optional[List[str]] = None
+    errors: Optional[List[str]] = None
+    
+    def add_step(self, step_name: str, now: Optional[datetime] = None):
+        """Add a processing step to the workflow, stamped with now (the current time if not given)"""
+        if self.processing_steps is None:
+            self.processing_steps = []
+        self.processing_steps.append(f"{step_name}: {(now or datetime.now(timezone.utc)).isoformat()}")
+    
+    def add_error(self, error: str, now: Optional[datetime] = None):
+        """Add an error to the workflow, stamped with now (the current time if not given)"""
+        if self.errors is None:
+            self.errors = []
+        self.errors.append(f"{error}: {(now or datetime.now(timezone.utc)).isoformat()}")
+    
+    def to_dict(self, shallow: bool = False, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Convert state to dictionary
+        
+        Args:
+            shallow: Summarize expert responses (count and first keys) instead of including them
+            fields: Only convert these fields; all of _DICT_FIELDS when None
+        """
+        return {name: self._field_to_dict(name, shallow) for name in (fields or _DICT_FIELDS)}
+    
+    def _field_to_dict(self, name: str, shallow: bool) -> Any:
+        """Dictionary value of a single state field"""
+        if name == "request":
+            return self.request.to_dict()
+        if name == "user_context":
+            return {
+                key: list(value) if isinstance(value, deque) else value
+                for key, value in self.user_context.items()
+            }
+        if name == "expert_responses" and shallow:
+            return {"count": len(self.expert_responses), "keys": list(self.expert_responses)[:5]}
+        if name == "start_time":
+            return self.start_time.isoformat()
+        if name == "end_time":
+            return self.end_time.isoformat() if self.end_time else None
+        if name in ("processing_steps", "errors"):
+            return getattr(self, name) or []
+        return getattr(self, name)
+
+
+# Fields included by WorkflowState.to_dict, in output order
+_DICT_FIELDS = (
+    "workflow_id", "request", "needs_translation", "source_language", "target_language",
+    "user_context", "conversation_history", "expert_responses", "summary", "followup_questions",
+    "formatted_response", "start_time", "end_time", "processing_steps", "errors"
+)
 
 
 class AnnaWorkflow:
@@ -81,12 +119,20 @@ class AnnaWorkflow:
     def __init__(self):
         """Initialize the Anna workflow"""
         self.memory = MemorySaver()
-        self.context_store = {}  # Global dictionary for user context storage
+        self.context_store = create_context_store()  # User context storage shared by all requests
+        self._build_context_nodes()
         self.workflow = self._build_workflow()
         self.logger = LoggerFactory.get_logger("AnnaWorkflow")
-        dev_draw_mermaid(self.workflow, prefix="anna_workflow_")
+        # Drawing calls the public Mermaid API and writes a PNG, so only do it when asked for
+        if os.getenv("DRAW_MERMAID"):
+            dev_draw_mermaid(self.workflow, prefix="anna_workflow_")
         self.logger.info("Anna workflow initialized successfully")
 
+    def _build_context_nodes(self):
+        """Create the nodes bound to this workflow's context store; they are reused for every request"""
+        self._context_management = ContextManagementNode(self.context_store)
+        self._context_update = ContextUpdateNode(self.context_store)
+
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow"""
         
@@ -107,15 +153,17 @@ class AnnaWorkflow:
         # Define the workflow edges
         workflow.set_entry_point("pre_node")
         
-        # Main flow
+        # Main flow; independent nodes run as parallel branches that join at the next node.
+        # Branch nodes return only the fields they change, since both branches write in the same step.
         workflow.add_edge("pre_node", "pre_translation_node")
+        # Context management records the prompt that pre-translation rewrites, so it runs after it
         workflow.add_edge("pre_translation_node", "context_management_node")
         workflow.add_edge("context_management_node", "expert_runner_node")
         workflow.add_edge("expert_runner_node", "summarizer_node")
         workflow.add_edge("summarizer_node", "followup_question_node")
-        workflow.add_edge("followup_question_node", "response_formatter_node")
-        workflow.add_edge("response_formatter_node", "context_update_node")
-        workflow.add_edge("context_update_node", "post_translation_node")
+        workflow.add_edge("summarizer_node", "context_update_node")
+        workflow.add_edge(["followup_question_node", "context_update_node"], "response_formatter_node")
+        workflow.add_edge("response_formatter_node", "post_translation_node")
         workflow.add_edge("post_translation_node", "post_node")
         workflow.add_edge("post_node", END)
         
@@ -124,19 +172,20 @@ class AnnaWorkflow:
     # Node implementations (placeholder methods - will be implemented in nodes.py)
     async def _pre_node(self, state: WorkflowState) -> WorkflowState:
         """Pre-processing node"""
-        from .nodes import PreNode
-        return await PreNode().run(state)
+        return await get_node(PreNode).run(state)
+    
+    @staticmethod
+    def _branch_update(state: WorkflowState, *fields: str) -> Dict[str, Any]:
+        """State update of a parallel branch node, limited to the fields it changes"""
+        return {name: getattr(state, name) for name in fields}
     
     async def _pre_translation_node(self, state: WorkflowState) -> WorkflowState:
         """Pre-translation node"""
-        from .nodes import PreTranslationNode
-        return await PreTranslationNode().run(state)
+        return await get_node(PreTranslationNode).run(state)
     
     async def _context_management_node(self, state: WorkflowState) -> WorkflowState:
         """Context management node"""
-        from .nodes import ContextManagementNode
-        correlation_id = state.request.user_context.correlation_id
-        return await ContextManagementNode(self.context_store, correlation_id=correlation_id).run(state)
+        return await self._context_management.run(state)
     
     
     async def _expert_runner_node(self, state: WorkflowState) -> WorkflowState:
@@ -154,20 +203,17 @@ class AnnaWorkflow:
                 user_context=state.user_context
             )
             
-            # Convert expert responses to a format compatible with workflow state
-            expert_responses = {}
+            # Store expert responses in workflow state, in a format compatible with it
+            expert_responses = state.expert_responses
             for expert_name, expert_response in expert_states.items():
                 expert_responses[expert_name] = {
                     "expert_name": expert_name,
                     "expert_response": expert_response.get('response',''),
-                    "opt_in": 'True',
+                    "opt_in": True,
                     "error": expert_response.get('error', ''),
                     "execution_time": expert_response.get('execution_time', 0),
                 }
             
-            # Store expert responses in workflow state
-            state.expert_responses = expert_responses
-            
             # Add processing step
             state.add_step("expert_execution_completed")
             
@@ -179,34 +225,29 @@ class AnnaWorkflow:
     
     async def _summarizer_node(self, state: WorkflowState) -> WorkflowState:
         """Summarizer node"""
-        from .nodes import SummarizerNode
-        return await SummarizerNode().run(state)
+        return await get_node(SummarizerNode).run(state)
     
-    async def _followup_question_node(self, state: WorkflowState) -> WorkflowState:
-        """Follow-up question node"""
-        from .nodes import FollowupQuestionNode
-        return await FollowupQuestionNode().run(state)
+    async def _followup_question_node(self, state: WorkflowState) -> Dict[str, Any]:
+        """Follow-up question node (runs in parallel with context update)"""
+        state = await get_node(FollowupQuestionNode).run(state)
+        return self._branch_update(state, "followup_questions")
     
     async def _response_formatter_node(self, state: WorkflowState) -> WorkflowState:
         """Response formatter node"""
-        from .nodes import ResponseFormatterNode
-        return await ResponseFormatterNode().run(state)
+        return await get_node(ResponseFormatterNode).run(state)
     
-    async def _context_update_node(self, state: WorkflowState) -> WorkflowState:
-        """Context update node"""
-        from .nodes import ContextUpdateNode
-        correlation_id = state.request.user_context.correlation_id
-        return await ContextUpdateNode(self.context_store, correlation_id=correlation_id).run(state)
+    async def _context_update_node(self, state: WorkflowState) -> Dict[str, Any]:
+        """Context update node (runs in parallel with follow-up questions)"""
+        state = await self._context_update.run(state)
+        return self._branch_update(state, "user_context")
     
     async def _post_translation_node(self, state: WorkflowState) -> WorkflowState:
         """Post-translation node"""
-        from .nodes import PostTranslationNode
-        return await PostTranslationNode().run(state)
+        return await get_node(PostTranslationNode).run(state)
     
     async def _post_node(self, state: WorkflowState) -> WorkflowState:
         """Post-processing node"""
-        from .nodes import PostNode
-        return await PostNode().run(state)
+        return await get_node(PostNode).run(state)
     
     
     async def process_request(self, request: AnnaRequest) -> Dict[str, Any]:
@@ -219,8 +260,10 @@ class AnnaWorkflow:
         Returns:
             Dictionary containing the final response and metadata
         """
+        # Create initial state; its workflow ID also names the workflow logger
+        initial_state = WorkflowState(request=request)
         workflow_logger = LoggerFactory.get_workflow_logger(
-            workflow_id=str(uuid.uuid4()),
+            workflow_id=initial_state.workflow_id,
             correlation_id=request.user_context.correlation_id
         )
         
@@ -231,19 +274,17 @@ class AnnaWorkflow:
                 "prompt": request.user_context.prompt[:100] + "..." if len(request.user_context.prompt) > 100 else request.user_context.prompt
             })
             
-            # Create initial state
-            initial_state = WorkflowState(request=request)
-            
-            # Run the workflow with checkpoint configuration
+            # Run the workflow with checkpoint configuration. Session continuity lives in the context store,
+            # so only the final checkpoint is written, and it is purged once the request is done (see finally).
             config = {"configurable": {"thread_id": request.user_context.session_id}}
             
-            final_state = await self.workflow.ainvoke(initial_state, config=config)
+            final_state = await self.workflow.ainvoke(initial_state, config=config, durability="exit")
             
             # Handle different return types
             if hasattr(final_state, 'end_time'):
                 # It's a WorkflowState object
                 final_state.end_time = datetime.now(timezone.utc)
-                final_state.add_step("workflow_completed")
+                final_state.add_step("workflow_completed", final_state.end_time)
                 workflow_logger.log_workflow_step("workflow", "completed", {
                     "workflow_id": final_state.workflow_id,
                     "status": "success",
@@ -268,28 +309,44 @@ class AnnaWorkflow:
                 return {"response": str(final_state), "type": str(type(final_state))}
             
         except Exception as e:
-            # Create error state
-            error_state = WorkflowState(request=request)
-            error_state.add_error(f"Workflow failed: {str(e)}")
-            error_state.end_time = datetime.now(timezone.utc)
+            # Record the failure on the state the workflow started with, under the workflow ID of its logs
+            initial_state.add_error(f"Workflow failed: {str(e)}")
+            initial_state.end_time = datetime.now(timezone.utc)
             
-            workflow_logger.error(f"Workflow failed: {str(e)}", {
-                "workflow_id": initial_state.workflow_id if 'initial_state' in locals() else "N/A",
+            workflow_logger.error("Workflow failed: %s", e, extra_data={
+                "workflow_id": initial_state.workflow_id,
                 "error_type": type(e).__name__,
-                "error_message": str(e),
-                "traceback": traceback.format_exc()
-            })
+                "error_message": str(e)
+            }, exc_info=True)
             raise
+        
+        finally:
+            # Without this, MemorySaver keeps every session's checkpoints for the life of the process
+            await self.memory.adelete_thread(request.user_context.session_id)
+    
+    async def process_batch(self, requests: List[AnnaRequest]) -> List[Any]:
+        """
+        Process several requests concurrently through the Anna workflow
+        The runs share the LLM clients and their connection pools. Each request needs its own session ID,
+        since the session ID is the workflow's checkpoint thread.
+        
+        Args:
+            requests: AnnaRequest objects to process
+            
+        Returns:
+            The process_request result for each request, in order, or the exception it raised
+        """
+        return await asyncio.gather(*(self.process_request(request) for request in requests), return_exceptions=True)
     
-    def get_user_context(self, user_id: str, session_id: str) -> Dict[str, Any]:
+    async def get_user_context(self, user_id: str, session_id: str) -> Dict[str, Any]:
         """Get user context from global storage"""
-        key = f"{user_id}_{session_id}"
-        return self.context_store.get(key, {})
+        key = (user_id, session_id)
+        return await self.context_store.get(key) or {}
     
-    def update_user_context(self, user_id: str, session_id: str, context: Dict[str, Any]):
+    async def update_user_context(self, user_id: str, session_id: str, context: Dict[str, Any]):
         """Update user context in global storage"""
-        key = f"{user_id}_{session_id}"
-        self.context_store[key] = context
+        key = (user_id, session_id)
+        await self.context_store.set(key, context)
 
 
 def main():
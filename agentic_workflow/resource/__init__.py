@@ -14,19 +14,30 @@ from .request_handler import (
 from .llm_service import (
     AnnaLLMRegistry,
     AnnaAzureLLM,
+    AnnaVLLM,
     BaseAnnaLLM
 )
 from .logger import (
     AnnaLogger,
     LoggerFactory,
     find_logs_by_correlation_id,
-    search_logs
+    search_logs,
+    afind_logs_by_correlation_id,
+    asearch_logs
 )
+from .llm_cache import LLMCache
+from .context_store import (
+    ContextStore,
+    MemoryContextStore,
+    RedisContextStore,
+    create_context_store
+)
+from .batch_llm import BatchLLMClient
 from .expert_decision import (
     ExpertDecision,
     create_expert_decision
 )
-from .workflow_visualizer import dev_draw_mermaid
+from .workflow_visualizer import dev_draw_mermaid, dev_draw_mermaid_async
 
 __all__ = [
     'AnnaRequest',
@@ -37,14 +48,24 @@ __all__ = [
     'LanguageCode',
     'AnnaLLMRegistry',
     'AnnaAzureLLM',
+    'AnnaVLLM',
     'BaseAnnaLLM',
+    'LLMCache',
+    'ContextStore',
+    'MemoryContextStore',
+    'RedisContextStore',
+    'create_context_store',
+    'BatchLLMClient',
     'AnnaLogger',
     'LoggerFactory',
     'find_logs_by_correlation_id',
     'search_logs',
+    'afind_logs_by_correlation_id',
+    'asearch_logs',
     'ExpertDecision',
     'create_expert_decision',
-    'dev_draw_mermaid'
+    'dev_draw_mermaid',
+    'dev_draw_mermaid_async'
 ]
 
 __version__ = "1.0.0"
@@ -0,0 +1,157 @@
+"""
+Batch LLM Client for Anna AI Coach System
+Coalesces offline chat completions into Azure OpenAI batch jobs
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from openai import AsyncAzureOpenAI
+
+from .logger import LoggerFactory
+
+
+class BatchLLMClient:
+    """
+    Submits chat completion requests through the Azure OpenAI Batch API.
+
+    Requests are buffered and flushed as one batch job when batch_size is
+    reached or window_seconds have passed since the first pending request.
+    Batch jobs run at a lower price but may take up to 24h, so this client is
+    meant for offline workloads (evaluation, backfills), not interactive use.
+    """
+    MIN_API_VERSION = "2024-08-01-preview"
+    TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+    def __init__(self, model_ref: str = "ANNA_GPT4O", batch_size: Optional[int] = None,
+                 window_seconds: Optional[float] = None, poll_interval: float = 30.0,
+                 temperature: float = 0.25):
+        """
+        Initialize the batch client
+
+        Args:
+            model_ref: Model reference used to look up the Azure configuration
+            batch_size: Flush as soon as this many requests are pending (env ANNA_BATCH_SIZE)
+            window_seconds: Flush this long after the first pending request (env ANNA_BATCH_WINDOW_SECONDS)
+            poll_interval: Seconds between batch status checks
+            temperature: Default sampling temperature for submitted requests
+        """
+        load_dotenv()
+
+        self.model_ref = model_ref
+        self.batch_size = batch_size or int(os.environ.get("ANNA_BATCH_SIZE", 1000))
+        self.window_seconds = window_seconds if window_seconds is not None else float(
+            os.environ.get("ANNA_BATCH_WINDOW_SECONDS", 60))
+        self.poll_interval = poll_interval
+        self.temperature = temperature
+        self.logger = LoggerFactory.get_logger("BatchLLMClient")
+
+        # Batch jobs need a batch-enabled deployment, which may differ from the online one
+        self.deployment_name = os.environ.get('BATCH_DEPLOYMENT_NAME_' + model_ref,
+                                              os.environ.get('DEPLOYMENT_NAME_' + model_ref))
+        api_version = os.environ.get('OPENAI_API_VERSION_' + model_ref, self.MIN_API_VERSION)
+        self.client = AsyncAzureOpenAI(
+            api_key=os.environ.get('AZURE_OPENAI_API_KEY_' + model_ref, os.environ.get('AZURE_OPENAI_API_KEY')),
+            azure_endpoint=os.environ.get('AZURE_OPENAI_ENDPOINT_' + model_ref, os.environ.get('AZURE_OPENAI_ENDPOINT')),
+            api_version=max(api_version, self.MIN_API_VERSION)
+        )
+
+        self._pending: Dict[str, Tuple[Dict[str, Any], asyncio.Future]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._jobs: set = set()
+
+    def submit(self, custom_id: str, messages: List[Dict[str, str]], **params) -> asyncio.Future:
+        """
+        Queue a chat completion request for the next batch job
+
+        Args:
+            custom_id: Unique ID of the request within the batch
+            messages: OpenAI-style message dicts ({"role": ..., "content": ...})
+            **params: Additional chat completion parameters
+
+        Returns:
+            Future resolved with the response text once the batch completes
+        """
+        future = asyncio.get_running_loop().create_future()
+        body = {"model": self.deployment_name, "messages": messages, "temperature": self.temperature}
+        body.update(params)
+        self._pending[custom_id] = (body, future)
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+        return future
+
+    def flush(self) -> None:
+        """Send all pending requests as one batch job now"""
+        if self._flush_task is not None and self._flush_task is not asyncio.current_task():
+            self._flush_task.cancel()
+        self._flush_task = None
+
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        job = asyncio.create_task(self._run_batch(pending))
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+
+    async def _flush_after_window(self):
+        """Flush pending requests once the batching window has elapsed"""
+        await asyncio.sleep(self.window_seconds)
+        self.flush()
+
+    async def _run_batch(self, pending: Dict[str, Tuple[Dict[str, Any], asyncio.Future]]):
+        """Upload the requests, wait for the batch job and resolve each request's future"""
+        try:
+            lines = "\n".join(
+                json.dumps({"custom_id": custom_id, "method": "POST", "url": "/chat/completions", "body": body},
+                           ensure_ascii=False)
+                for custom_id, (body, _) in pending.items()
+            )
+            batch_file = await self.client.files.create(file=("batch.jsonl", lines.encode("utf-8")), purpose="batch")
+            batch = await self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/chat/completions",
+                completion_window="24h"
+            )
+            self.logger.info("Submitted batch %s with %s requests", batch.id, len(pending))
+
+            while batch.status not in self.TERMINAL_STATUSES:
+                await asyncio.sleep(self.poll_interval)
+                batch = await self.client.batches.retrieve(batch.id)
+
+            if batch.status != "completed":
+                raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+            results = {}
+            if batch.output_file_id:
+                output = await self.client.files.content(batch.output_file_id)
+                for line in output.text.splitlines():
+                    if line.strip():
+                        entry = json.loads(line)
+                        results[entry["custom_id"]] = entry
+
+            self.logger.info("Batch %s completed with %s results", batch.id, len(results))
+
+            for custom_id, (_, future) in pending.items():
+                if future.done():
+                    continue
+                entry = results.get(custom_id)
+                response = entry.get("response") if entry else None
+                if not response or response.get("status_code") != 200:
+                    error = entry.get("error") if entry else "missing from batch output"
+                    future.set_exception(RuntimeError(f"Batch request {custom_id} failed: {error}"))
+                else:
+                    future.set_result(response["body"]["choices"][0]["message"]["content"])
+
+        except Exception as e:
+            self.logger.error("Batch job failed: %s", e, extra_data={"requests": len(pending)})
+            for _, future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
@@ -0,0 +1,121 @@
+"""
+Context Store for Anna AI Coach System
+Async storage of per-session user context, in process or in Redis
+"""
+
+import os
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import orjson
+
+from .llm_cache import LLMCache
+
+# Context keys are (user_id, session_id) tuples; plain "user_session" strings are still accepted for compatibility
+ContextKey = Union[Tuple[str, str], str]
+
+
+def _to_builtin(obj: Any) -> Any:
+    """orjson fallback for context values it cannot serialize natively"""
+    if isinstance(obj, deque):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _snapshot(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a context's top-level dict and conversation history, so later changes on either side stay apart"""
+    snapshot = dict(context)
+    history = snapshot.get("conversation_history")
+    if isinstance(history, deque):
+        snapshot["conversation_history"] = deque(history, maxlen=history.maxlen)
+    return snapshot
+
+
+class ContextStore(ABC):
+    """Async key-value store for user context"""
+
+    @abstractmethod
+    async def get(self, key: ContextKey) -> Optional[Dict[str, Any]]:
+        """Get the context stored under key, or None"""
+        pass
+
+    @abstractmethod
+    async def set(self, key: ContextKey, value: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """Store a context, expiring it after ttl seconds if given"""
+        pass
+
+    async def get_many(self, keys: List[ContextKey]) -> List[Optional[Dict[str, Any]]]:
+        """Get several contexts at once, in key order"""
+        return [await self.get(key) for key in keys]
+
+
+class MemoryContextStore(ContextStore):
+    """In-process context store; per worker and lost on restart"""
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: float = 86400):
+        """
+        Initialize the in-process context store
+
+        Args:
+            maxsize: Maximum number of sessions kept; the least recently used is evicted (env ANNA_CONTEXT_STORE_MAXSIZE)
+            ttl: Seconds a context is kept when set() is called without a ttl
+        """
+        maxsize = maxsize or int(os.environ.get("ANNA_CONTEXT_STORE_MAXSIZE", 10000))
+        self._contexts = LLMCache(maxsize=maxsize, ttl=ttl)
+
+    # Contexts are copied in and out, like the serialized copies of RedisContextStore, so a caller
+    # changing its context after set() or get() never changes the stored one
+    async def get(self, key: ContextKey) -> Optional[Dict[str, Any]]:
+        context = self._contexts.get(key)
+        return _snapshot(context) if context is not None else None
+
+    async def set(self, key: ContextKey, value: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        self._contexts.set(key, _snapshot(value), ttl=ttl)
+
+
+class RedisContextStore(ContextStore):
+    """Redis-backed context store shared by all workers"""
+
+    def __init__(self, url: str, prefix: str = "anna:context:"):
+        """
+        Initialize the Redis context store
+
+        Args:
+            url: Redis connection URL, e.g. redis://localhost:6379/0
+            prefix: Prefix added to every key
+        """
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise ImportError("RedisContextStore requires the 'redis' package (pip install redis)") from e
+
+        self.redis = Redis.from_url(url)
+        self.prefix = prefix
+
+    def _redis_key(self, key: ContextKey) -> str:
+        """Redis key for a context key; tuples map to the "user_session" form used by earlier releases"""
+        return self.prefix + (key if isinstance(key, str) else "_".join(key))
+
+    async def get(self, key: ContextKey) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(self._redis_key(key))
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key: ContextKey, value: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        await self.redis.set(self._redis_key(key), orjson.dumps(value, default=_to_builtin), ex=ttl)
+
+    async def get_many(self, keys: List[ContextKey]) -> List[Optional[Dict[str, Any]]]:
+        # One pipelined round trip instead of one per key
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(self._redis_key(key))
+            raws = await pipe.execute()
+        return [orjson.loads(raw) if raw is not None else None for raw in raws]
+
+
+def create_context_store() -> ContextStore:
+    """Create the context store: Redis when ANNA_REDIS_URL is set, in process otherwise"""
+    redis_url = os.environ.get("ANNA_REDIS_URL")
+    if redis_url:
+        return RedisContextStore(redis_url)
+    return MemoryContextStore()
@@ -3,14 +3,46 @@ Expert Decision Module
 Handles expert opt-in decision logic for the Anna AI Coach system
 """
 
-from typing import Optional
+import asyncio
+import re
+from typing import Optional, Dict, List, Tuple
+import orjson
 from .llm_service import AnnaLLMRegistry
+from .llm_cache import LLMCache
 from .logger import LoggerFactory
 
 
+# Answers that count as a "yes" decision, compared after lowercasing
+_YES_TOKENS = frozenset({"yes", "true", "1", "y"})
+
+def _warn_if_blocking(logger, method: str) -> None:
+    """Warn when a sync decision method is called from a running event loop, which it would block"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    logger.warning("%s called from a running event loop; await its async variant instead", method)
+
+
+# "Decision: ..." line followed later by a "Reasoning: ..." line, as requested by the reasoning prompt
+_REASONING_RE = re.compile(r"^[ \t]*decision:[ \t]*([^\n]*).*?^[ \t]*reasoning:[ \t]*([^\n]*)", re.I | re.M | re.S)
+
+
 class ExpertDecision:
     """Handles expert opt-in decision logic"""
     
+    # Decisions shared across requests, keyed by expert and prompt. Failed LLM calls are never cached.
+    _decision_cache = LLMCache(maxsize=4096, ttl=3600)
+    
+    # Coaching LLM shared by all decisions (see _coaching_llm)
+    _llm = None
+    
+    # Async decisions currently waiting on the LLM, by cache key, so identical concurrent requests share one call
+    _inflight: Dict[str, asyncio.Task] = {}
+    
+    # Only the first word of a decision is read, so stop generating right after it
+    DECISION_MAX_TOKENS = 3
+    
     def __init__(self, expert_name: str, description: str, correlation_id: Optional[str] = None):
         """
         Initialize the ExpertDecision class
@@ -23,9 +55,66 @@ class ExpertDecision:
         self.expert_name = expert_name
         self.description = description
         self.correlation_id = correlation_id
-        self.llm = AnnaLLMRegistry().get_coaching_llm()
+        
+        # Only the user question varies between calls, so the text around it is built once here
+        self._decision_prompt_prefix = f"""
+            You are a {expert_name} expert. Based on the user's question, decide if you should provide advice.
+            
+            Expert Description: {description}
+            User Question: """
+        self._decision_prompt_suffix = f"""
+            
+            Respond with only 'yes' or 'no' based on whether this question requires {expert_name} expertise.
+            """
+        self._reasoning_prompt_suffix = f"""
+            
+            First, respond with only 'yes' or 'no' based on whether this question requires {expert_name} expertise.
+            Then, provide a brief explanation of your reasoning.
+            
+            Format your response as:
+            Decision: [yes/no]
+            Reasoning: [your explanation]
+            """
         self.logger = LoggerFactory.get_expert_logger(expert_name, correlation_id)
     
+    @property
+    def llm(self):
+        """Shared coaching LLM; resolved on first use, so creating a decision maker costs no registry lookup"""
+        return self._coaching_llm()
+    
+    @classmethod
+    def _coaching_llm(cls):
+        """Get the coaching LLM, creating it on first use only"""
+        if ExpertDecision._llm is None:
+            ExpertDecision._llm = AnnaLLMRegistry().get_coaching_llm()
+        return ExpertDecision._llm
+    
+    @staticmethod
+    def _decision_cache_key(expert_name: str, description: str, user_prompt: str) -> str:
+        """Cache key for an expert's decision on a prompt"""
+        return LLMCache.cache_key("decision", expert_name, description, user_prompt)
+    
+    @staticmethod
+    def _reasoning_cache_key(expert_name: str, description: str, user_prompt: str) -> str:
+        """Cache key for an expert's decision and reasoning on a prompt"""
+        return LLMCache.cache_key("reasoning", expert_name, description, user_prompt)
+    
+    def _build_decision_prompt(self, user_prompt: str) -> str:
+        """Build the yes/no decision prompt for the user's question"""
+        return "".join((self._decision_prompt_prefix, user_prompt, self._decision_prompt_suffix))
+    
+    def _parse_decision(self, response) -> bool:
+        """Turn the LLM's yes/no response into a boolean decision"""
+        # Extract the decision
+        decision_text = (response.content if hasattr(response, 'content') else str(response)).strip().lower()
+        
+        # Determine the decision
+        should_answer = decision_text in _YES_TOKENS
+        
+        self.logger.info("Expert decision for '%s': %s -> %s", self.expert_name, decision_text, should_answer)
+        
+        return should_answer
+    
     def make_decision(self, user_prompt: str) -> bool:
         """
         Make a decision on whether the expert should answer the user's question
@@ -36,91 +125,285 @@ class ExpertDecision:
         Returns:
             True if the expert should answer, False otherwise
         """
+        cache_key = self._decision_cache_key(self.expert_name, self.description, user_prompt)
+        cached = self._decision_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("Decision cache hit for %s", self.expert_name)
+            return cached
+        
+        _warn_if_blocking(self.logger, "make_decision")
         try:
-            # Create the decision prompt
-            decision_prompt = f"""
-            You are a {self.expert_name} expert. Based on the user's question, decide if you should provide advice.
-            
-            Expert Description: {self.description}
-            User Question: {user_prompt}
-            
-            Respond with only 'yes' or 'no' based on whether this question requires {self.expert_name} expertise.
-            """
-            
             # Get the decision from LLM
             response = self.llm.quick_prompt(
-                decision_prompt, 
-                system=f"You are a {self.expert_name} expert. Respond with only 'yes' or 'no'."
+                self._build_decision_prompt(user_prompt), 
+                system=f"You are a {self.expert_name} expert. Respond with only 'yes' or 'no'.",
+                max_tokens=self.DECISION_MAX_TOKENS
             )
             
-            # Extract the decision
-            decision_text = response.content.strip().lower() if hasattr(response, 'content') else str(response).strip().lower()
+            should_answer = self._parse_decision(response)
+            self._decision_cache.set(cache_key, should_answer)
+            return should_answer
             
-            # Determine the decision
-            should_answer = decision_text in ['yes', 'true', '1']
+        except Exception as e:
+            self.logger.error("Failed to make decision for %s: %s", self.expert_name, e)
+            # Default to False (don't answer) if there's an error
+            return False
+    
+    async def amake_decision(self, user_prompt: str) -> bool:
+        """
+        Async variant of make_decision that does not block the event loop
+        
+        Args:
+            user_prompt: The user's question/prompt
             
-            self.logger.info(f"Expert decision for '{self.expert_name}': {decision_text} -> {should_answer}")
+        Returns:
+            True if the expert should answer, False otherwise
+        """
+        cache_key = self._decision_cache_key(self.expert_name, self.description, user_prompt)
+        cached = self._decision_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("Decision cache hit for %s", self.expert_name)
+            return cached
+        
+        # Join an identical decision that is already in flight instead of asking again
+        inflight = self._inflight.get(cache_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._aask_decision(user_prompt, cache_key))
+            ExpertDecision._inflight[cache_key] = inflight
+            inflight.add_done_callback(lambda _: ExpertDecision._inflight.pop(cache_key, None))
+        
+        # Shielded so that a cancelled caller does not cancel the call other callers are waiting on
+        return await asyncio.shield(inflight)
+    
+    async def _aask_decision(self, user_prompt: str, cache_key: str) -> bool:
+        """Ask the LLM for a decision and cache it; never raises"""
+        try:
+            # Get the decision from LLM
+            response = await self.llm.quick_prompt_async(
+                self._build_decision_prompt(user_prompt), 
+                system=f"You are a {self.expert_name} expert. Respond with only 'yes' or 'no'.",
+                max_tokens=self.DECISION_MAX_TOKENS
+            )
             
+            should_answer = self._parse_decision(response)
+            self._decision_cache.set(cache_key, should_answer)
             return should_answer
             
         except Exception as e:
-            self.logger.error(f"Failed to make decision for {self.expert_name}: {str(e)}")
+            self.logger.error("Failed to make decision for %s: %s", self.expert_name, e)
             # Default to False (don't answer) if there's an error
             return False
     
-    def get_decision_reasoning(self, user_prompt: str) -> tuple[bool, str]:
+    @staticmethod
+    def _build_batch_prompt(user_prompt: str, experts: List[Tuple[str, str]]) -> str:
+        """Build one routing prompt that asks for a yes/no decision per expert"""
+        expert_lines = "\n".join(f"- {name}: {description}" for name, description in experts)
+        return f"""
+            You are routing a user's question to a panel of experts. For each expert below, decide if the question requires that expert's advice.
+            
+            Experts:
+{expert_lines}
+            
+            User Question: {user_prompt}
+            
+            Respond with a JSON object mapping every expert name to 'yes' or 'no'.
+            """
+    
+    @staticmethod
+    def _parse_batch_decision(response, experts: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """Turn the routing response into {expert_name: decision}, skipping experts the LLM left out"""
+        if hasattr(response, 'content'):
+            response = orjson.loads(response.content)
+        
+        decisions = {}
+        for name, _ in experts:
+            if name in response:
+                decisions[name] = str(response[name]).strip().lower() in _YES_TOKENS
+        return decisions
+    
+    @classmethod
+    def _cached_batch_decisions(cls, user_prompt: str, experts: List[Tuple[str, str]]):
+        """Split experts into cached decisions and the experts that still need the LLM"""
+        decisions = {}
+        uncached = []
+        for name, description in experts:
+            cached = cls._decision_cache.get(cls._decision_cache_key(name, description, user_prompt))
+            if cached is None:
+                uncached.append((name, description))
+            else:
+                decisions[name] = cached
+        return decisions, uncached
+    
+    @classmethod
+    def _cache_batch_decisions(cls, user_prompt: str, experts: List[Tuple[str, str]], response) -> Dict[str, bool]:
+        """Parse a routing response and cache each expert's decision"""
+        decisions = cls._parse_batch_decision(response, experts)
+        descriptions = dict(experts)
+        for name, decision in decisions.items():
+            cls._decision_cache.set(cls._decision_cache_key(name, descriptions[name], user_prompt), decision)
+        return decisions
+    
+    @classmethod
+    def make_batch_decision(cls, user_prompt: str, experts: List[Tuple[str, str]],
+                            correlation_id: Optional[str] = None) -> Dict[str, bool]:
         """
-        Make a decision and return both the decision and reasoning
+        Decide for several experts at once with a single LLM call
         
         Args:
             user_prompt: The user's question/prompt
+            experts: List of (expert_name, description) tuples
+            correlation_id: Optional correlation ID for logging
             
         Returns:
-            Tuple of (decision: bool, reasoning: str)
+            Dictionary of expert name to decision. Experts missing from the
+            LLM response are left out so callers can decide them individually.
         """
+        logger = LoggerFactory.get_logger("ExpertDecision", correlation_id)
+        decisions, uncached = cls._cached_batch_decisions(user_prompt, experts)
+        if not uncached:
+            return decisions
+        
+        _warn_if_blocking(logger, "make_batch_decision")
         try:
-            # Create the decision prompt with reasoning request
-            decision_prompt = f"""
-            You are a {self.expert_name} expert. Based on the user's question, decide if you should provide advice.
+            response = cls._coaching_llm().quick_prompt(
+                cls._build_batch_prompt(user_prompt, uncached),
+                system="You route questions to experts. Respond with a JSON object only.",
+                json_output=True
+            )
+            decisions.update(cls._cache_batch_decisions(user_prompt, uncached, response))
+            logger.info("Batch expert decision: %s", decisions)
+            return decisions
             
-            Expert Description: {self.description}
-            User Question: {user_prompt}
+        except Exception as e:
+            logger.error("Failed to make batch decision: %s", e)
+            return decisions
+    
+    @classmethod
+    async def amake_batch_decision(cls, user_prompt: str, experts: List[Tuple[str, str]],
+                                   correlation_id: Optional[str] = None) -> Dict[str, bool]:
+        """
+        Async variant of make_batch_decision
+        
+        Args:
+            user_prompt: The user's question/prompt
+            experts: List of (expert_name, description) tuples
+            correlation_id: Optional correlation ID for logging
             
-            First, respond with only 'yes' or 'no' based on whether this question requires {self.expert_name} expertise.
-            Then, provide a brief explanation of your reasoning.
+        Returns:
+            Dictionary of expert name to decision. Experts missing from the
+            LLM response are left out so callers can decide them individually.
+        """
+        logger = LoggerFactory.get_logger("ExpertDecision", correlation_id)
+        decisions, uncached = cls._cached_batch_decisions(user_prompt, experts)
+        if not uncached:
+            return decisions
+        
+        try:
+            response = await cls._coaching_llm().quick_prompt_async(
+                cls._build_batch_prompt(user_prompt, uncached),
+                system="You route questions to experts. Respond with a JSON object only.",
+                json_output=True
+            )
+            decisions.update(cls._cache_batch_decisions(user_prompt, uncached, response))
+            logger.info("Batch expert decision: %s", decisions)
+            return decisions
             
-            Format your response as:
-            Decision: [yes/no]
-            Reasoning: [your explanation]
-            """
+        except Exception as e:
+            logger.error("Failed to make batch decision: %s", e)
+            return decisions
+    
+    def _build_reasoning_prompt(self, user_prompt: str) -> str:
+        """Build the decision prompt that also asks for the reasoning"""
+        return "".join((self._decision_prompt_prefix, user_prompt, self._reasoning_prompt_suffix))
+    
+    def _parse_reasoning(self, response) -> tuple[bool, str]:
+        """Turn the LLM's 'Decision: / Reasoning:' response into (decision, reasoning)"""
+        response_text = response.content if hasattr(response, 'content') else str(response)
+        
+        match = _REASONING_RE.search(response_text)
+        if match:
+            decision = match.group(1).strip().lower() in _YES_TOKENS
+            reasoning = match.group(2).strip()
+            self.logger.info("Expert decision with reasoning for '%s': %s - %s", self.expert_name, decision, reasoning)
+            return decision, reasoning
+        
+        # Line by line for responses that do not follow the format exactly (e.g. reasoning before decision)
+        lines = response_text.strip().split('\n')
+        decision = False
+        reasoning = "No reasoning provided"
+        
+        for line in lines:
+            line = line.strip()
+            lowered = line.lower()
+            if lowered.startswith('decision:'):
+                decision_text = lowered.split(':', 1)[1].strip()
+                decision = decision_text in _YES_TOKENS
+            elif lowered.startswith('reasoning:'):
+                reasoning = line.split(':', 1)[1].strip()
+        
+        self.logger.info("Expert decision with reasoning for '%s': %s - %s", self.expert_name, decision, reasoning)
+        
+        return decision, reasoning
+    
+    def get_decision_reasoning(self, user_prompt: str) -> tuple[bool, str]:
+        """
+        Make a decision and return both the decision and reasoning
+        
+        Args:
+            user_prompt: The user's question/prompt
             
+        Returns:
+            Tuple of (decision: bool, reasoning: str)
+        """
+        cache_key = self._reasoning_cache_key(self.expert_name, self.description, user_prompt)
+        cached = self._decision_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("Decision cache hit for %s", self.expert_name)
+            return cached
+        
+        _warn_if_blocking(self.logger, "get_decision_reasoning")
+        try:
             # Get the decision from LLM
             response = self.llm.quick_prompt(
-                decision_prompt, 
+                self._build_reasoning_prompt(user_prompt), 
                 system=f"You are a {self.expert_name} expert. Provide clear decision and reasoning."
             )
+            decision = self._parse_reasoning(response)
+            self._decision_cache.set(cache_key, decision)
+            return decision
             
-            response_text = response.content if hasattr(response, 'content') else str(response)
-            
-            # Parse the response
-            lines = response_text.strip().split('\n')
-            decision = False
-            reasoning = "No reasoning provided"
-            
-            for line in lines:
-                line = line.strip()
-                if line.lower().startswith('decision:'):
-                    decision_text = line.split(':', 1)[1].strip().lower()
-                    decision = decision_text in ['yes', 'true', '1']
-                elif line.lower().startswith('reasoning:'):
-                    reasoning = line.split(':', 1)[1].strip()
-            
-            self.logger.info(f"Expert decision with reasoning for '{self.expert_name}': {decision} - {reasoning}")
+        except Exception as e:
+            self.logger.error("Failed to make decision with reasoning for %s: %s", self.expert_name, e)
+            return False, f"Error occurred: {str(e)}"
+    
+    async def aget_decision_reasoning(self, user_prompt: str) -> tuple[bool, str]:
+        """
+        Async variant of get_decision_reasoning
+        
+        Args:
+            user_prompt: The user's question/prompt
             
-            return decision, reasoning
+        Returns:
+            Tuple of (decision: bool, reasoning: str)
+        """
+        cache_key = self._reasoning_cache_key(self.expert_name, self.description, user_prompt)
+        cached = self._decision_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("Decision cache hit for %s", self.expert_name)
+            return cached
+        
+        try:
+            # Get the decision from LLM
+            response = await self.llm.quick_prompt_async(
+                self._build_reasoning_prompt(user_prompt), 
+                system=f"You are a {self.expert_name} expert. Provide clear decision and reasoning."
+            )
+            decision = self._parse_reasoning(response)
+            self._decision_cache.set(cache_key, decision)
+            return decision
             
         except Exception as e:
-            self.logger.error(f"Failed to make decision with reasoning for {self.expert_name}: {str(e)}")
+            self.logger.error("Failed to make decision with reasoning for %s: %s", self.expert_name, e)
             return False, f"Error occurred: {str(e)}"
 
 
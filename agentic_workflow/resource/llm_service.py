@@ -2,15 +2,78 @@
 Anna LLM Service for Anna AI Coach System using Azure OpenAI
 """
 
+import copy
 import os
+import time
+import random
+import asyncio
+import itertools
+from functools import lru_cache
 from enum import Enum
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai.chat_models import AzureChatOpenAI
+import httpx
+from openai import APIConnectionError, InternalServerError, RateLimitError
 from dotenv import load_dotenv
+from .llm_cache import LLMCache
 from .logger import LoggerFactory
 
+load_dotenv()
+
+# LangChain is imported where it is first needed (building a client or a prompt), not when
+# the resource package is imported
+if TYPE_CHECKING:
+    from langchain_core.prompts import ChatPromptTemplate
+
+
+def _split_static_dynamic(system) -> Tuple[Optional[str], Optional[str]]:
+    """Split a system prompt into its (static, dynamic) parts; a plain string is all static"""
+    if isinstance(system, dict):
+        return system.get("static"), system.get("dynamic")
+    return system, None
+
+
+@lru_cache(maxsize=4)
+def _chat_template(static: bool, dynamic: bool) -> "ChatPromptTemplate":
+    """
+    Quick prompt template for the given system parts, compiled once.
+    Message contents are filled in as variables, so braces in prompts are never parsed as placeholders.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+
+    msgs = []
+    if static:
+        msgs.append(("system", "{static}"))
+    if dynamic:
+        msgs.append(("system", "{dynamic}"))
+    msgs.append(("user", "{human}"))
+    return ChatPromptTemplate.from_messages(msgs)
+
+
+# Transient API errors worth retrying: 429s, connection failures/timeouts and 5xx responses
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """Jittered exponential backoff for the given attempt, never shorter than the server's Retry-After"""
+    delay = min(RETRY_BASE_DELAY * 2 ** attempt + random.random(), RETRY_MAX_DELAY)
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), RETRY_MAX_DELAY))
+        except ValueError:
+            pass  # HTTP-date form, keep the computed backoff
+    return delay
+
+
+# Connection pools shared by every LLM client, so concurrent expert calls reuse open TLS connections
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+HTTP_CLIENT = httpx.Client(limits=HTTP_LIMITS)
+HTTP_ASYNC_CLIENT = httpx.AsyncClient(limits=HTTP_LIMITS)
+
 
 class BaseAnnaLLM:
     """Base class for Anna LLM implementations"""
@@ -19,23 +82,30 @@ class BaseAnnaLLM:
         """Initialize base Anna LLM"""
         print(f"Creating AnnaLLM for model {model_ref}")
         self.model_ref = model_ref
+        self._llms: Dict[tuple, Any] = {}  # LangChain clients built so far, by configuration (see _get_llm)
 
 
 class AnnaAzureLLM(BaseAnnaLLM):
     """Azure OpenAI implementation for Anna LLM"""
     MIN_API_VERSION = "2024-08-01-preview"
+    
+    # Exact-match cache of quick prompt responses for callers that opt in with cache=True and keep
+    # no cache of their own (experts, nodes and expert decisions cache their results themselves)
+    _prompt_cache = LLMCache(maxsize=2048, ttl=3600)
+
+    # quick_prompt_stream coalesces streamed chunks into growing batches to cut per-chunk overhead
+    STREAM_BATCH_SIZE = 8
+    STREAM_MAX_BATCH_SIZE = 64
+    STREAM_BATCH_GROWTH = 2
+    STREAM_FLUSH_INTERVAL_MS = 50
 
     def __init__(self, model_ref: str):
         """Initialize Azure OpenAI LLM for Anna"""
         super().__init__(model_ref)
 
-        # Load environment variables
-        load_dotenv()
-
         # Basic configuration
-        self.temperature = None
-        self.set_temperature(0.25)
-        self.max_retries = 2
+        self.temperature = 0.25
+        self.max_retries = 4
         self.request_timeout = 120
         
         # Initialize logger
@@ -69,22 +139,32 @@ class AnnaAzureLLM(BaseAnnaLLM):
         """
         temperature = max(0, min(temperature, 2))
         if temperature >= 0.3:
-            print(f'LLM temperature is at or above "creative": {temperature}')
+            self.logger.debug('LLM temperature is at or above "creative": %s', temperature)
 
         self.temperature = temperature
 
     def _get_llm(self, streaming: bool, **kwargs):
-        """Get LangChain LLM instance with configuration"""
+        """Get LangChain LLM instance with configuration, reusing the one built for the same configuration"""
+        key = (streaming, self.temperature, tuple(sorted(kwargs.items())))
+        llm = self._llms.get(key)
+        if llm is None:
+            llm = self._llms[key] = self._build_llm(streaming, **kwargs)
+        return llm
+
+    def _build_llm(self, streaming: bool, **kwargs):
+        """Build a LangChain LLM instance with configuration"""
         model_params = dict(
             streaming=streaming, 
             temperature=self.temperature, 
-            max_retries=self.max_retries,
+            max_retries=self.max_retries if streaming else 0,  # buffered calls retry in _invoke_with_retry
             request_timeout=self.request_timeout, 
             openai_api_type=self.openai_api_type,
             azure_endpoint=self.azure_openai_endpoint, 
             openai_api_key=self.azure_openai_api_key,
             deployment_name=self.deployment_name, 
-            openai_api_version=self.openai_api_version
+            openai_api_version=self.openai_api_version,
+            http_client=HTTP_CLIENT,
+            http_async_client=HTTP_ASYNC_CLIENT
         )
         
         if kwargs:
@@ -93,8 +173,74 @@ class AnnaAzureLLM(BaseAnnaLLM):
         if model_params['openai_api_version'] < self.MIN_API_VERSION:
             model_params['openai_api_version'] = self.MIN_API_VERSION
 
+        from langchain_openai.chat_models import AzureChatOpenAI
         return AzureChatOpenAI(**model_params)
 
+    def _prompt_cache_key(self, cache: bool, human: str, system: Optional[str], json_output: bool, schema,
+                          kwargs: Dict[str, Any]) -> Optional[str]:
+        """Cache key of a quick prompt call, or None if the call does not use the prompt cache"""
+        if not cache:
+            return None
+        return LLMCache.cache_key(
+            self.model_ref, self.model_name, str(self.temperature), str(json_output),
+            schema.__name__ if schema is not None else "", *(part or "" for part in _split_static_dynamic(system)),
+            human, repr(sorted(kwargs.items()))
+        )
+
+    @staticmethod
+    def _build_chat(human: str, system=None) -> list:
+        """
+        Build the chat messages for a quick prompt.
+        Static instructions come first and per-call content last, so calls share the longest possible
+        prefix and hit the provider's automatic prompt (prefix) cache. Keep dynamic state out of the
+        static part of the system prompt; pass it as {"static": ..., "dynamic": ...} instead.
+        """
+        static, dynamic = _split_static_dynamic(system)
+        return _chat_template(bool(static), bool(dynamic)).format_messages(
+            static=static or "", dynamic=dynamic or "", human=human)
+
+    def _log_cache_hit(self, human: str, system: Optional[str], response, duration: float, is_async: bool = False):
+        """Log a quick prompt answered from the prompt cache"""
+        extra_data = {"system_prompt": system, "model_ref": self.model_ref, "cache": "hit"}
+        if is_async:
+            extra_data["async"] = True
+        self.logger.log_llm_call(
+            prompt=human,
+            response=response.content if hasattr(response, 'content') else str(response),
+            model=self.model_name,
+            duration=duration,
+            extra_data=extra_data
+        )
+
+    def _log_retry(self, attempt: int, delay: float, error: Exception):
+        """Log a retry of a failed LLM call"""
+        self.logger.warning("LLM call failed (%s), retry %d/%d in %.2fs", type(error).__name__, attempt + 1,
+                            self.max_retries, delay, extra_data={"model_ref": self.model_ref, "error": str(error)})
+
+    def _invoke_with_retry(self, runnable, chat, **kwargs):
+        """Invoke the runnable, retrying transient API errors with jittered exponential backoff"""
+        for attempt in itertools.count():
+            try:
+                return runnable.invoke(chat, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = _retry_delay(attempt, e)
+                self._log_retry(attempt, delay, e)
+                time.sleep(delay)
+
+    async def _ainvoke_with_retry(self, runnable, chat, **kwargs):
+        """Async counterpart of _invoke_with_retry; waits with asyncio.sleep so the event loop keeps running"""
+        for attempt in itertools.count():
+            try:
+                return await runnable.ainvoke(chat, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = _retry_delay(attempt, e)
+                self._log_retry(attempt, delay, e)
+                await asyncio.sleep(delay)
+
     @property
     def llm_buffering(self):
         """Get non-streaming LLM instance"""
@@ -105,35 +251,41 @@ class AnnaAzureLLM(BaseAnnaLLM):
         """Get streaming LLM instance"""
         return self._get_llm(streaming=True)
     
-    def quick_prompt(self, human: str, system: str = None, json_output: bool = False, **kwargs):
+    def quick_prompt(self, human: str, system: str = None, json_output: bool = False, schema=None, cache: bool = False,
+                     **kwargs):
         """
         Quick synchronous prompt for Anna LLM
         
         Args:
             human: User message
-            system: System message (optional)
+            system: System message (optional); a {"static": ..., "dynamic": ...} dict keeps per-call content last
             json_output: Whether to return JSON output
+            schema: Pydantic model the output is constrained to (optional, returns an instance of it)
+            cache: Answer identical calls from the shared prompt cache (for callers without a cache of their own)
             **kwargs: Additional parameters for LLM call
             
         Returns:
             LLM response
         """
-        import time
         start_time = time.time()
         
-        if system:
-            msgs = [("system", system), ("user", human)]
-        else:
-            msgs = [("user", human)]
-            
-        chat_template = ChatPromptTemplate.from_messages(msgs)
-        chat = chat_template.format_messages()
+        cache_key = self._prompt_cache_key(cache, human, system, json_output, schema, kwargs)
+        if cache_key is not None:
+            cached = self._prompt_cache.get(cache_key)
+            if cached is not None:
+                self._log_cache_hit(human, system, cached, time.time() - start_time)
+                return cached
+        
+        chat = self._build_chat(human, system)
         
         try:
-            if json_output:
-                response = self.llm_buffering.with_structured_output(method="json_mode").invoke(chat, **kwargs)
+            if schema is not None:
+                runnable = self.llm_buffering.with_structured_output(schema, method="json_schema", strict=True)
+            elif json_output:
+                runnable = self.llm_buffering.with_structured_output(method="json_mode")
             else:
-                response = self.llm_buffering.invoke(chat, **kwargs)
+                runnable = self.llm_buffering
+            response = self._invoke_with_retry(runnable, chat, **kwargs)
             
             duration = time.time() - start_time
             
@@ -147,15 +299,19 @@ class AnnaAzureLLM(BaseAnnaLLM):
                 extra_data={
                     "system_prompt": system,
                     "json_output": json_output,
-                    "model_ref": self.model_ref
+                    "schema": schema.__name__ if schema is not None else None,
+                    "model_ref": self.model_ref,
+                    "cache": "miss" if cache_key is not None else "bypass"
                 }
             )
             
+            if cache_key is not None:
+                self._prompt_cache.set(cache_key, response)
             return response
             
         except Exception as e:
             duration = time.time() - start_time
-            self.logger.error(f"LLM call failed: {str(e)}", {
+            self.logger.error("LLM call failed: %s", e, extra_data={
                 "prompt": human,
                 "system_prompt": system,
                 "model": self.model_name,
@@ -164,34 +320,135 @@ class AnnaAzureLLM(BaseAnnaLLM):
             })
             raise
     
-    async def quick_prompt_async(self, human: str, system: str = None, json_output: bool = False, **kwargs):
+    async def quick_prompt_async(self, human: str, system: str = None, json_output: bool = False, schema=None,
+                                 cache: bool = False, **kwargs):
         """
         Quick asynchronous prompt for Anna LLM
         
         Args:
             human: User message
-            system: System message (optional)
+            system: System message (optional); a {"static": ..., "dynamic": ...} dict keeps per-call content last
             json_output: Whether to return JSON output
+            schema: Pydantic model the output is constrained to (optional, returns an instance of it)
+            cache: Answer identical calls from the shared prompt cache (for callers without a cache of their own)
             **kwargs: Additional parameters for LLM call
             
         Returns:
             LLM response
         """
-        if system:
-            msgs = [("system", system), ("user", human)]
-        else:
-            msgs = [("user", human)]
-            
-        chat_template = ChatPromptTemplate.from_messages(msgs)
-        chat = chat_template.format_messages()
-        
-        if json_output:
-            response = await self.llm_buffering.with_structured_output(method="json_mode").ainvoke(chat, **kwargs)
-        else:
-            response = await self.llm_buffering.ainvoke(chat, **kwargs)
+        start_time = time.time()
+
+        cache_key = self._prompt_cache_key(cache, human, system, json_output, schema, kwargs)
+        if cache_key is not None:
+            cached = self._prompt_cache.get(cache_key)
+            if cached is not None:
+                self._log_cache_hit(human, system, cached, time.time() - start_time, is_async=True)
+                return cached
+
+        chat = self._build_chat(human, system)
+
+        try:
+            if schema is not None:
+                runnable = self.llm_buffering.with_structured_output(schema, method="json_schema", strict=True)
+            elif json_output:
+                runnable = self.llm_buffering.with_structured_output(method="json_mode")
+            else:
+                runnable = self.llm_buffering
+            response = await self._ainvoke_with_retry(runnable, chat, **kwargs)
+
+            duration = time.time() - start_time
+
+            # Log the LLM call
+            response_content = response.content if hasattr(response, 'content') else str(response)
+            self.logger.log_llm_call(
+                prompt=human,
+                response=response_content,
+                model=self.model_name,
+                duration=duration,
+                extra_data={
+                    "system_prompt": system,
+                    "json_output": json_output,
+                    "schema": schema.__name__ if schema is not None else None,
+                    "model_ref": self.model_ref,
+                    "async": True,
+                    "cache": "miss" if cache_key is not None else "bypass"
+                }
+            )
+
+            if cache_key is not None:
+                self._prompt_cache.set(cache_key, response)
+            return response
+
+        except Exception as e:
+            duration = time.time() - start_time
+            self.logger.error("Async LLM call failed: %s", e, extra_data={
+                "prompt": human,
+                "system_prompt": system,
+                "model": self.model_name,
+                "duration": duration,
+                "error": str(e)
+            })
+            raise
+
+    async def quick_prompt_threaded(self, human: str, system: str = None, json_output: bool = False, schema=None,
+                                    cache: bool = False, **kwargs):
+        """
+        Run the synchronous quick_prompt in a worker thread so it does not block the event loop.
+        For code that must go through the sync client; async callers should prefer quick_prompt_async.
+
+        Args and return value are the same as quick_prompt.
+        """
+        return await asyncio.to_thread(self.quick_prompt, human, system, json_output, schema, cache, **kwargs)
+
+    async def quick_prompt_stream(self, human: str, system: str = None, batch_size: int = None,
+                                  flush_interval_ms: float = None, **kwargs):
+        """
+        Streaming prompt for Anna LLM
+        The first chunk is yielded as soon as it arrives; later chunks are coalesced into batches that
+        are flushed once batch_size chunks are held, or when a chunk arrives flush_interval_ms or more
+        after the previous flush. The batch size grows by STREAM_BATCH_GROWTH after each flush, up to
+        STREAM_MAX_BATCH_SIZE.
+
+        Args:
+            human: User message
+            system: System message (optional); a {"static": ..., "dynamic": ...} dict keeps per-call content last
+            batch_size: Chunks per batch initially (default STREAM_BATCH_SIZE, 1 disables batching)
+            flush_interval_ms: Minimum spacing between flushes while chunks are arriving (default STREAM_FLUSH_INTERVAL_MS)
+            **kwargs: Additional parameters for LLM call
+
+        Yields:
+            Response text, one string per batch
+        """
+        batch_size = batch_size or self.STREAM_BATCH_SIZE
+        max_batch_size = max(batch_size, self.STREAM_MAX_BATCH_SIZE) if batch_size > 1 else 1
+        flush_interval = (flush_interval_ms if flush_interval_ms is not None else self.STREAM_FLUSH_INTERVAL_MS) / 1000
+        chat = self._build_chat(human, system)
+
+        loop = asyncio.get_running_loop()
+        start_time = last_flush = loop.time()
+        batch = []
+        first = True
+        async for chunk in self.llm_streaming.astream(chat, **kwargs):
+            if not chunk.content:
+                continue
+            batch.append(chunk.content)
+            now = loop.time()
+            if first:
+                first = False
+                self.logger.info("LLM stream first chunk in %.0fms", (now - start_time) * 1000,
+                                 extra_data={"ttft_ms": (now - start_time) * 1000, "model": self.model_name,
+                                             "model_ref": self.model_ref})
+            elif len(batch) < batch_size and now - last_flush < flush_interval:
+                continue
+            else:
+                batch_size = min(batch_size * self.STREAM_BATCH_GROWTH, max_batch_size)
+            yield "".join(batch)
+            batch.clear()
+            last_flush = now
+
+        if batch:
+            yield "".join(batch)
 
-        return response
-    
     def quick_prompt_with_messages(self, messages: list, json_output: bool = False, **kwargs):
         """
         Quick prompt with custom messages list
@@ -204,15 +461,71 @@ class AnnaAzureLLM(BaseAnnaLLM):
         Returns:
             LLM response
         """
+        from langchain_core.prompts import ChatPromptTemplate
         chat_template = ChatPromptTemplate.from_messages(messages)
         chat = chat_template.format_messages()
         
-        if json_output:
-            response = self.llm_buffering.with_structured_output(method="json_mode").invoke(chat, **kwargs)
-        else:
-            response = self.llm_buffering.invoke(chat, **kwargs)
+        runnable = self.llm_buffering.with_structured_output(method="json_mode") if json_output else self.llm_buffering
+        return self._invoke_with_retry(runnable, chat, **kwargs)
+
 
-        return response
+class AnnaVLLM(AnnaAzureLLM):
+    """
+    Self-hosted vLLM implementation for Anna LLM, using vLLM's OpenAI-compatible API.
+    Intended for a quantized model served with e.g.:
+        vllm serve Qwen/Qwen2.5-32B-Instruct-AWQ --quantization awq --kv-cache-dtype fp8 --enable-prefix-caching
+    Several replicas can be listed comma-separated in VLLM_BASE_URL_<model_ref>; calls are spread round-robin.
+    """
+
+    def __init__(self, model_ref: str):
+        """Initialize self-hosted vLLM for Anna"""
+        BaseAnnaLLM.__init__(self, model_ref)
+
+        # Basic configuration
+        self.temperature = 0.25
+        self.max_retries = 4
+        self.request_timeout = 120
+
+        # Initialize logger
+        self.logger = LoggerFactory.get_llm_logger()
+
+        # vLLM server configuration
+        self.base_urls = [url.strip() for url in os.environ.get('VLLM_BASE_URL_' + model_ref, '').split(',') if url.strip()]
+        self.api_key = os.environ.get('VLLM_API_KEY_' + model_ref, 'EMPTY')
+
+        if not self.base_urls:
+            raise ValueError("Missing environment variable for vLLM.")
+
+        self._replicas = itertools.cycle(self.base_urls)
+
+        try:
+            self.model_name = os.environ['MODEL_NAME_' + model_ref]
+        except KeyError:
+            print(f"Missing environment variable for vLLM model {model_ref}.")
+            raise
+
+    def _get_llm(self, streaming: bool, **kwargs):
+        """Get LangChain LLM instance for the next replica; one client is kept per replica"""
+        return super()._get_llm(streaming, base_url=next(self._replicas), **kwargs)
+
+    def _build_llm(self, streaming: bool, **kwargs):
+        """Build a LangChain LLM instance with configuration (kwargs include the replica's base_url)"""
+        model_params = dict(
+            streaming=streaming,
+            temperature=self.temperature,
+            max_retries=self.max_retries if streaming else 0,  # buffered calls retry in _invoke_with_retry
+            request_timeout=self.request_timeout,
+            api_key=self.api_key,
+            model=self.model_name,
+            http_client=HTTP_CLIENT,
+            http_async_client=HTTP_ASYNC_CLIENT
+        )
+
+        if kwargs:
+            model_params.update(kwargs)
+
+        from langchain_openai.chat_models import ChatOpenAI
+        return ChatOpenAI(**model_params)
 
 
 class AnnaLLMRegistry:
@@ -221,8 +534,10 @@ class AnnaLLMRegistry:
     class Models(str, Enum):
         """List all the Models supported by Anna LLM"""
         ANNA_GPT4O = "ANNA_GPT4O"
+        ANNA_QUANTIZED = "ANNA_QUANTIZED"
 
     DEFAULT_MODEL = Models.ANNA_GPT4O
+    SELF_HOSTED_MODELS = (Models.ANNA_QUANTIZED,)
 
     @property
     def supported_models(self):
@@ -230,23 +545,26 @@ class AnnaLLMRegistry:
         return [x.value for x in self.Models]
 
     def get_llm(self, model_name: Models = None):
-        """Get LLM instance by model name"""
+        """
+        Get LLM instance by model name
+        Each caller gets its own shallow copy of the model's process-wide instance: configuration and
+        LangChain clients are shared, while set_temperature only changes the caller's copy.
+        """
         if not model_name:
             print(f"No model name provided. Using default: {self.DEFAULT_MODEL}")
             model_name = self.DEFAULT_MODEL
 
         if model_name not in self.Models:
             raise ValueError(f"LLM model name {model_name} is not configured in the registry.")
-        else:
-            return AnnaAzureLLM(model_name)  # All models are Azure for now
+        return copy.copy(_llm_instance(model_name))
 
     def get_llm_by_name(self, model_name: str):
         """Get LLM instance by string name"""
         return self.get_llm(self.Models(model_name.upper()))
 
     def get_coaching_llm(self):
-        """Get the default coaching LLM"""
-        return self.get_llm(self.Models.ANNA_GPT4O)
+        """Get the default coaching LLM, overridable with ANNA_COACHING_MODEL (e.g. ANNA_QUANTIZED)"""
+        return self.get_llm(self.Models(os.environ.get('ANNA_COACHING_MODEL', self.Models.ANNA_GPT4O.value)))
 
     def get_reasoning_llm(self):
         """Get the reasoning LLM for complex analysis"""
@@ -254,6 +572,12 @@ class AnnaLLMRegistry:
 
 
 
+@lru_cache(maxsize=len(AnnaLLMRegistry.Models))
+def _llm_instance(model_name: AnnaLLMRegistry.Models) -> AnnaAzureLLM:
+    """The process-wide LLM instance of a model, built on first use"""
+    if model_name in AnnaLLMRegistry.SELF_HOSTED_MODELS:
+        return AnnaVLLM(model_name)
+    return AnnaAzureLLM(model_name)
 
 
 def test_anna_registry():
@@ -3,89 +3,171 @@ Custom Logger for Anna AI Coach System
 Provides structured logging with correlation_id and user_id tracking
 """
 
+import asyncio
+import atexit
 import logging
-import json
+import logging.handlers
+import mmap
 import os
+import queue
+import threading
+import orjson
+from collections import OrderedDict
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@lru_cache(maxsize=1)
+def _project_root() -> Path:
+    """Nearest directory upwards from the working directory holding a .env file (found once per process)"""
+    current = Path.cwd()
+    while current != current.parent:
+        if (current / ".env").exists():
+            return current
+        current = current.parent
+    return Path.cwd()
+
+
+@lru_cache(maxsize=1)
+def _log_dir() -> Path:
+    """The project's logs directory, created on first use"""
+    log_dir = _project_root() / "logs"
+    log_dir.mkdir(exist_ok=True)
+    return log_dir
+
+
+# All AnnaLoggers enqueue their records here; one background listener thread writes them out
+_LOG_QUEUE = queue.SimpleQueue()
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+_LISTENER_LOCK = threading.Lock()
+
+
+class _CorrelationFileHandler(logging.Handler):
+    """Writes each record to the log file of its correlation_id, keeping the most recently used files open"""
+
+    def __init__(self, log_dir: Path, maxsize: int = 256):
+        super().__init__(logging.DEBUG)
+        self.log_dir = log_dir
+        self.maxsize = maxsize
+        self._handlers: "OrderedDict[str, logging.FileHandler]" = OrderedDict()
+
+    def emit(self, record: logging.LogRecord):
+        correlation_id = getattr(record, "correlation_id", None)
+        if not correlation_id:
+            return
+        handler = self._handlers.pop(correlation_id, None)
+        if handler is None:
+            if len(self._handlers) >= self.maxsize:
+                self._handlers.popitem(last=False)[1].close()
+            handler = logging.FileHandler(self.log_dir / f"correlation_{correlation_id}.log", encoding='utf-8')
+            handler.setFormatter(self.formatter)
+        self._handlers[correlation_id] = handler
+        handler.emit(record)
+
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+
+def _start_listener(log_dir: Path):
+    """Start the listener thread that owns the console and file handlers (once per process)"""
+    global _LISTENER
+    with _LISTENER_LOCK:
+        if _LISTENER is not None:
+            return
+        formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(name)s | %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+        # Console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+
+        # General log file
+        general_handler = logging.FileHandler(log_dir / "anna_general.log", encoding='utf-8')
+        general_handler.setLevel(logging.DEBUG)
+
+        # Correlation-specific log files
+        correlation_handler = _CorrelationFileHandler(log_dir)
+
+        handlers = (console_handler, general_handler, correlation_handler)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        _LISTENER = logging.handlers.QueueListener(_LOG_QUEUE, *handlers, respect_handler_level=True)
+        _LISTENER.start()
+        atexit.register(_stop_listener)
+
+
+def _stop_listener():
+    """Drain the queue and close the log files"""
+    _LISTENER.stop()
+    for handler in _LISTENER.handlers:
+        handler.close()
+
+
 class AnnaLogger:
     def __init__(self, name: str, correlation_id: Optional[str] = None):
         self.name = name
         self.correlation_id = correlation_id
-        self.project_root = self._get_project_root()
-        self.log_dir = self.project_root / "logs"
-        self.log_dir.mkdir(exist_ok=True)
+        # Serialized fixed fields of every entry, as an open JSON object ending with ','
+        fixed = {"logger": name, "correlation_id": correlation_id} if correlation_id else {"logger": name}
+        self._prefix = orjson.dumps(fixed)[:-1] + b","
+        self.project_root = _project_root()
+        self.log_dir = _log_dir()
         self.logger = logging.getLogger(f"anna.{name}")
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.setLevel(os.getenv("ANNA_LOG_LEVEL", "DEBUG").upper())
         if not self.logger.handlers:
             self._setup_handlers()
     
-    def _get_project_root(self) -> Path:
-        current = Path.cwd()
-        while current != current.parent:
-            if (current / ".env").exists():
-                return current
-            current = current.parent
-        return Path.cwd()
-
     def _setup_handlers(self):
-        # Create formatter
-        formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(name)s | %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-        
-        # File handlers
-        self._setup_file_handlers(formatter)
-
-    def _setup_file_handlers(self, formatter):
-        # General log file
-        general_handler = logging.FileHandler(self.log_dir / "anna_general.log", encoding='utf-8')
-        general_handler.setLevel(logging.DEBUG)
-        general_handler.setFormatter(formatter)
-        self.logger.addHandler(general_handler)
-        
-        # Correlation-specific log file
-        if self.correlation_id:
-            correlation_handler = logging.FileHandler(self.log_dir / f"correlation_{self.correlation_id}.log", encoding='utf-8')
-            correlation_handler.setLevel(logging.DEBUG)
-            correlation_handler.setFormatter(formatter)
-            self.logger.addHandler(correlation_handler)
+        # Records are only enqueued here; console and file output happen on the listener thread
+        queue_handler = logging.handlers.QueueHandler(_LOG_QUEUE)
+        self.logger.addHandler(queue_handler)
+        _start_listener(self.log_dir)
 
     def _format_message(self, message: str, extra_data: Optional[Dict[str, Any]] = None) -> str:
         log_data = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "logger": self.name,
+            "timestamp": datetime.now(timezone.utc),  # orjson writes it in ISO format
             "message": message
         }
-        if self.correlation_id:
-            log_data["correlation_id"] = self.correlation_id
         if extra_data:
             log_data["extra"] = extra_data
-        return json.dumps(log_data, ensure_ascii=False, default=str)
+        # orjson writes UTF-8 as is (like ensure_ascii=False); non-str keys are allowed since extra data may use them
+        body = orjson.dumps(log_data, default=str, option=orjson.OPT_NON_STR_KEYS)
+        # Splice the per-call fields after the fixed fields of this logger (the body's '{' is dropped)
+        return (self._prefix + body[1:]).decode()
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
 
-    def debug(self, message: str, extra_data: Optional[Dict[str, Any]] = None):
-        self.logger.debug(self._format_message(message, extra_data))
+    def _log(self, level: int, message: str, args: tuple, extra_data: Optional[Dict[str, Any]], exc_info: bool = False):
+        # Skip %-formatting and JSON encoding entirely when the level is filtered out
+        if not self.logger.isEnabledFor(level):
+            return
+        if args:
+            message = message % args
+        # With exc_info the QueueHandler formats the active exception's traceback on this thread when it enqueues the record
+        self.logger.log(level, self._format_message(message, extra_data), exc_info=exc_info,
+                        extra={"correlation_id": self.correlation_id})
 
-    def info(self, message: str, extra_data: Optional[Dict[str, Any]] = None):
-        self.logger.info(self._format_message(message, extra_data))
+    def debug(self, message: str, *args, extra_data: Optional[Dict[str, Any]] = None, exc_info: bool = False):
+        self._log(logging.DEBUG, message, args, extra_data, exc_info)
 
-    def warning(self, message: str, extra_data: Optional[Dict[str, Any]] = None):
-        self.logger.warning(self._format_message(message, extra_data))
+    def info(self, message: str, *args, extra_data: Optional[Dict[str, Any]] = None, exc_info: bool = False):
+        self._log(logging.INFO, message, args, extra_data, exc_info)
 
-    def error(self, message: str, extra_data: Optional[Dict[str, Any]] = None):
-        self.logger.error(self._format_message(message, extra_data))
+    def warning(self, message: str, *args, extra_data: Optional[Dict[str, Any]] = None, exc_info: bool = False):
+        self._log(logging.WARNING, message, args, extra_data, exc_info)
 
-    def critical(self, message: str, extra_data: Optional[Dict[str, Any]] = None):
-        self.logger.critical(self._format_message(message, extra_data))
+    def error(self, message: str, *args, extra_data: Optional[Dict[str, Any]] = None, exc_info: bool = False):
+        self._log(logging.ERROR, message, args, extra_data, exc_info)
+
+    def critical(self, message: str, *args, extra_data: Optional[Dict[str, Any]] = None, exc_info: bool = False):
+        self._log(logging.CRITICAL, message, args, extra_data, exc_info)
 
     # Specialized logging methods
     def log_workflow_step(self, step: str, status: str, extra_data: Optional[Dict[str, Any]] = None):
@@ -93,7 +175,7 @@ class AnnaLogger:
         step_data = {"step": step, "status": status}
         if extra_data:
             step_data.update(extra_data)
-        self.info(f"Workflow step: {step} - {status}", step_data)
+        self.info("Workflow step: %s - %s", step, status, extra_data=step_data)
 
     def log_llm_call(self, prompt: str, response: str, model: str, duration: float, extra_data: Optional[Dict[str, Any]] = None):
         """Log LLM call with performance metrics"""
@@ -105,7 +187,7 @@ class AnnaLogger:
         }
         if extra_data:
             llm_data.update(extra_data)
-        self.info(f"LLM call completed in {duration:.2f}s", llm_data)
+        self.info("LLM call completed in %.2fs", duration, extra_data=llm_data)
 
     def log_expert_response(self, expert_name: str, response: str, duration: float, extra_data: Optional[Dict[str, Any]] = None):
         """Log expert response with performance metrics"""
@@ -116,7 +198,7 @@ class AnnaLogger:
         }
         if extra_data:
             expert_data.update(extra_data)
-        self.info(f"Expert {expert_name} responded in {duration:.2f}s", expert_data)
+        self.info("Expert %s responded in %.2fs", expert_name, duration, extra_data=expert_data)
 
     def log_user_interaction(self, user_id: str, session_id: str, action: str, extra_data: Optional[Dict[str, Any]] = None):
         """Log user interaction"""
@@ -127,65 +209,73 @@ class AnnaLogger:
         }
         if extra_data:
             interaction_data.update(extra_data)
-        self.info(f"User interaction: {action}", interaction_data)
+        self.info("User interaction: %s", action, extra_data=interaction_data)
 
 
 class LoggerFactory:
     @staticmethod
-    def get_logger(name: str, correlation_id: Optional[str] = None) -> AnnaLogger:
+    @lru_cache(maxsize=2048)
+    def _cached_logger(name: str, correlation_id: Optional[str]) -> AnnaLogger:
+        # One AnnaLogger per (name, correlation_id); evicted entries belong to finished requests
         return AnnaLogger(name, correlation_id)
+
+    @staticmethod
+    def get_logger(name: str, correlation_id: Optional[str] = None) -> AnnaLogger:
+        return LoggerFactory._cached_logger(name, correlation_id)
     
     @staticmethod
     def get_workflow_logger(workflow_id: str, correlation_id: Optional[str] = None) -> AnnaLogger:
-        return AnnaLogger(f"workflow.{workflow_id}", correlation_id)
+        return LoggerFactory._cached_logger(f"workflow.{workflow_id}", correlation_id)
     
     @staticmethod
     def get_node_logger(node_name: str, correlation_id: Optional[str] = None) -> AnnaLogger:
-        return AnnaLogger(f"node.{node_name}", correlation_id)
+        return LoggerFactory._cached_logger(f"node.{node_name}", correlation_id)
     
     @staticmethod
     def get_llm_logger(correlation_id: Optional[str] = None) -> AnnaLogger:
-        return AnnaLogger("llm", correlation_id)
+        return LoggerFactory._cached_logger("llm", correlation_id)
     
     @staticmethod
     def get_expert_logger(expert_name: str, correlation_id: Optional[str] = None) -> AnnaLogger:
-        return AnnaLogger(f"expert.{expert_name}", correlation_id)
+        return LoggerFactory._cached_logger(f"expert.{expert_name}", correlation_id)
 
 
 # Utility functions for log analysis
+def _read_log_lines(log_file: Path):
+    """Yield the raw lines of a log file, read through a memory map"""
+    with open(log_file, 'rb') as f:
+        # An empty file cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter(mm.readline, b"")
+
+
+def _parse_log_line(line: bytes) -> Optional[Dict[str, Any]]:
+    """JSON entry of a log line (after the timestamp prefix), or None for other lines such as tracebacks"""
+    line = line.strip()
+    if not line:
+        return None
+    # Extract JSON part after the timestamp prefix
+    json_part = line.split(b'|', 3)[-1].strip() if b'|' in line else line
+    try:
+        return orjson.loads(json_part)
+    except orjson.JSONDecodeError:
+        return None
+
+
 def find_logs_by_correlation_id(correlation_id: str) -> list:
     """Find all logs for a specific correlation ID"""
     try:
-        # Find project root
-        current = Path.cwd()
-        while current != current.parent:
-            if (current / ".env").exists():
-                log_dir = current / "logs"
-                break
-            current = current.parent
-        else:
-            log_dir = Path.cwd() / "logs"
-        
-        correlation_file = log_dir / f"correlation_{correlation_id}.log"
+        correlation_file = _log_dir() / f"correlation_{correlation_id}.log"
         if not correlation_file.exists():
             return []
         
         logs = []
-        with open(correlation_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    # Extract JSON part after the timestamp prefix
-                    if '|' in line:
-                        json_part = line.split('|', 3)[-1].strip()
-                    else:
-                        json_part = line
-                    
-                    try:
-                        log_entry = json.loads(json_part)
-                        logs.append(log_entry)
-                    except json.JSONDecodeError:
-                        continue
+        for line in _read_log_lines(correlation_file):
+            log_entry = _parse_log_line(line)
+            if log_entry is not None:
+                logs.append(log_entry)
         
         return logs
     except Exception as e:
@@ -196,36 +286,20 @@ def find_logs_by_correlation_id(correlation_id: str) -> list:
 def search_logs(query: str, log_file: str = "anna_general.log") -> list:
     """Search logs for specific terms"""
     try:
-        # Find project root
-        current = Path.cwd()
-        while current != current.parent:
-            if (current / ".env").exists():
-                log_dir = current / "logs"
-                break
-            current = current.parent
-        else:
-            log_dir = Path.cwd() / "logs"
-        
-        log_file_path = log_dir / log_file
+        log_file_path = _log_dir() / log_file
         if not log_file_path.exists():
             return []
         
+        # An ASCII query is matched on the raw bytes, so non-matching lines are never decoded
+        ascii_query = query.isascii()
+        needle = query.lower().encode() if ascii_query else query.lower()
         matching_logs = []
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if query.lower() in line.lower():
-                    # Extract JSON part after the timestamp prefix
-                    if '|' in line:
-                        json_part = line.split('|', 3)[-1].strip()
-                    else:
-                        json_part = line
-                    
-                    try:
-                        log_entry = json.loads(json_part)
-                        matching_logs.append(log_entry)
-                    except json.JSONDecodeError:
-                        continue
+        for line in _read_log_lines(log_file_path):
+            haystack = line.lower() if ascii_query else line.decode('utf-8', errors='replace').lower()
+            if needle in haystack:
+                log_entry = _parse_log_line(line)
+                if log_entry is not None:
+                    matching_logs.append(log_entry)
         
         return matching_logs
     except Exception as e:
@@ -233,11 +307,21 @@ def search_logs(query: str, log_file: str = "anna_general.log") -> list:
         return []
 
 
+async def afind_logs_by_correlation_id(correlation_id: str) -> list:
+    """find_logs_by_correlation_id in a worker thread, so reading the file does not block the event loop"""
+    return await asyncio.to_thread(find_logs_by_correlation_id, correlation_id)
+
+
+async def asearch_logs(query: str, log_file: str = "anna_general.log") -> list:
+    """search_logs in a worker thread, so reading the file does not block the event loop"""
+    return await asyncio.to_thread(search_logs, query, log_file)
+
+
 if __name__ == "__main__":
     # Test the logger
     logger = LoggerFactory.get_logger("test", "test-correlation-123")
     
-    logger.info("Test message", {"key": "value"})
+    logger.info("Test message", extra_data={"key": "value"})
     logger.log_workflow_step("test_step", "started", {"user_id": "user123"})
     logger.log_llm_call("test prompt", "test response", "gpt-4", 1.5)
     logger.log_expert_response("business_strategist", "expert advice", 2.0)
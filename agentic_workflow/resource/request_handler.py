@@ -2,11 +2,14 @@
 Simple Request Handler for Anna AI Coach System
 """
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import Dict, List, Optional, Any
 from enum import Enum
 from datetime import datetime, timezone
+import copy
+import os
 import uuid
+import orjson
 
 
 class LanguageCode(Enum):
@@ -21,7 +24,26 @@ class LanguageCode(Enum):
     ARABIC = "ar"
 
 
-@dataclass
+def _with_datetime(data: Dict[str, Any], key: str = "timestamp") -> Dict[str, Any]:
+    """Copy of data with its ISO timestamp string parsed to a datetime (left as is if it does not parse)"""
+    value = data.get(key)
+    if not isinstance(value, str):
+        return data
+    data = dict(data)
+    try:
+        data[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    return data
+
+
+def _new_ids(count: int) -> List[str]:
+    """count random (version 4) UUID strings, from one read of the OS random source"""
+    raw = os.urandom(16 * count)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
+@dataclass(slots=True)
 class UserContext:
     """User context information"""
     prompt: str
@@ -41,7 +63,7 @@ class UserContext:
             self.user_profile = {}
 
 
-@dataclass
+@dataclass(slots=True)
 class FollowUpQuestion:
     """Follow-up question structure"""
     question: str
@@ -56,7 +78,7 @@ class FollowUpQuestion:
             self.question_id = str(uuid.uuid4())
 
 
-@dataclass
+@dataclass(slots=True)
 class UserSelection:
     """User selection for disambiguation"""
     selection_id: str
@@ -70,7 +92,7 @@ class UserSelection:
             self.timestamp = datetime.now(timezone.utc)
 
 
-@dataclass
+@dataclass(slots=True)
 class RequestMetadata:
     """Additional request metadata"""
     request_id: str
@@ -85,7 +107,7 @@ class RequestMetadata:
             self.tags = []
 
 
-@dataclass
+@dataclass(slots=True)
 class AnnaRequest:
     """Main request structure for Anna AI Coach"""
     language: Dict[str, str]  # {"name": "English", "code": "en"}
@@ -110,44 +132,26 @@ class AnnaRequest:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AnnaRequest':
         """Create AnnaRequest from dictionary"""
-        # Convert datetime strings back to datetime objects
-        def convert_datetime(obj):
-            if isinstance(obj, str):
-                try:
-                    return datetime.fromisoformat(obj.replace('Z', '+00:00'))
-                except ValueError:
-                    return obj
-            return obj
-        
-        def process_dict(d):
-            for key, value in d.items():
-                if isinstance(value, dict):
-                    process_dict(value)
-                elif isinstance(value, list):
-                    for item in value:
-                        if isinstance(item, dict):
-                            process_dict(item)
-                else:
-                    d[key] = convert_datetime(value)
-        
-        # Create a copy to avoid modifying original data
+        # Build the nested objects field by field; only the typed timestamp fields are parsed,
+        # free-form payload (history, profile, additional data) is passed through untouched
         processed_data = data.copy()
-        process_dict(processed_data)
         
-        # Reconstruct nested objects
         if 'user_context' in processed_data:
-            processed_data['user_context'] = UserContext(**processed_data['user_context'])
+            processed_data['user_context'] = UserContext(**_with_datetime(processed_data['user_context']))
         
         if 'follow_up' in processed_data and processed_data['follow_up']:
+            # IDs for the questions without one are drawn from the OS in a single read
+            ids = iter(_new_ids(sum(1 for q in processed_data['follow_up'] if not q.get('question_id'))))
             processed_data['follow_up'] = [
-                FollowUpQuestion(**q) for q in processed_data['follow_up']
+                FollowUpQuestion(**q) if q.get('question_id') else FollowUpQuestion(**{**q, 'question_id': next(ids)})
+                for q in processed_data['follow_up']
             ]
         
         if 'user_selection' in processed_data and processed_data['user_selection']:
-            processed_data['user_selection'] = UserSelection(**processed_data['user_selection'])
+            processed_data['user_selection'] = UserSelection(**_with_datetime(processed_data['user_selection']))
         
         if 'metadata' in processed_data and processed_data['metadata']:
-            processed_data['metadata'] = RequestMetadata(**processed_data['metadata'])
+            processed_data['metadata'] = RequestMetadata(**_with_datetime(processed_data['metadata']))
         
         if 'scope' in processed_data and processed_data['scope']:
             try:
@@ -159,29 +163,13 @@ class AnnaRequest:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert AnnaRequest to dictionary"""
-        result = asdict(self)
-        
-        # Convert datetime objects to strings and enums to values
-        def process_dict(d):
-            for key, value in d.items():
-                if isinstance(value, dict):
-                    process_dict(value)
-                elif isinstance(value, list):
-                    for item in value:
-                        if isinstance(item, dict):
-                            process_dict(item)
-                elif isinstance(value, datetime):
-                    d[key] = value.isoformat()
-                elif isinstance(value, Enum):
-                    d[key] = value.value
-        
-        process_dict(result)
-        return result
+        # orjson walks the dataclasses in C, writing datetimes as ISO strings and enums as their values
+        return orjson.loads(orjson.dumps(self, default=str, option=orjson.OPT_NON_STR_KEYS))
     
     @classmethod
     def from_object(cls, obj: 'AnnaRequest') -> 'AnnaRequest':
         """Create AnnaRequest from another AnnaRequest object (copy)"""
-        return cls.from_dict(obj.to_dict())
+        return copy.deepcopy(obj)
 
 
 def main():
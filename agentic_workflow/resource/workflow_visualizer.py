@@ -1,23 +1,86 @@
 import os
 import time
+import asyncio
+import hashlib
 import logging
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Rendered PNGs by hash of the graph's mermaid source, in memory and on disk across runs
+_PNG_CACHE = {}
+CACHE_DIR = Path.home() / ".cache" / "anna_mermaid"
+
+_BACKGROUND_TASKS = set()
+
+
+def _render_png(graph, sleep_time: float) -> bytes:
+    """PNG of the graph, rendered by Mermaid's public API only if this graph was not rendered before"""
+    key = hashlib.blake2b(graph.draw_mermaid().encode()).hexdigest()
+    png = _PNG_CACHE.get(key)
+    if png is not None:
+        return png
+
+    cache_file = CACHE_DIR / f"{key}.png"
+    if cache_file.exists():
+        png = cache_file.read_bytes()
+    else:
+        time.sleep(sleep_time)  # Mermaid's public API seems really defensive against DDOS.
+        png = graph.draw_mermaid_png()
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            cache_file.write_bytes(png)
+        except OSError as e:
+            logger.warning("MERMAID: Could not cache graph image: %s", e)
+    _PNG_CACHE[key] = png
+    return png
+
+
+def _write_file(file_path, data: bytes):
+    """Write data to a file through an unbuffered descriptor, it is dumped in one go anyway"""
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
 def dev_draw_mermaid(wf, prefix="", sleep_time=1.0):
-    """Draws a Mermaid graph and saves it in the project root."""
+    """
+    Draws a Mermaid graph and saves it in the project root.
+    Inside a running event loop the drawing is handed to a worker thread in the background,
+    so the loop is not blocked by the pause and the HTTP call.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _draw_mermaid(wf, prefix, sleep_time)
+        return
+    task = loop.create_task(dev_draw_mermaid_async(wf, prefix, sleep_time))
+    # Keep a reference until it is done, the loop only holds weak ones
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+async def dev_draw_mermaid_async(wf, prefix="", sleep_time=1.0):
+    """Draws a Mermaid graph and saves it in the project root, in a worker thread."""
+    await asyncio.to_thread(_draw_mermaid, wf, prefix, sleep_time)
+
+
+def _draw_mermaid(wf, prefix, sleep_time):
     # Define the directory to save the image
     project_root = os.getcwd()  # Get the current working directory
     file_name = f"{prefix}_mermaid_graph.png"
     file_path = os.path.join(project_root, file_name)
 
     try:
-        time.sleep(sleep_time)  # Mermaid's public API seems really defensive against DDOS.
-        with open(file_path, "wb") as image_file:
-            image_file.write(wf.get_graph().draw_mermaid_png())
-        logger.info(f"MERMAID: Graph image saved: {file_path}")
+        png = _render_png(wf.get_graph(), sleep_time)
+        _write_file(file_path, png)
+        logger.info("MERMAID: Graph image saved: %s", file_path)
         print(f"MERMAID: Graph image saved: {file_path}")
     except Exception as e:
-        logger.error(f"MERMAID: Error drawing graph: {e}")
+        logger.error("MERMAID: Error drawing graph: %s", e)
         print(f"MERMAID: Error drawing graph: {e}")
-        return
\ No newline at end of file
+        return
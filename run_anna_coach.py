@@ -7,63 +7,82 @@ Simple script to run the Anna AI Coach system interactively
 import os
 import sys
 import asyncio
-from datetime import datetime
-from typing import Dict, Any
-import traceback
+import itertools
+import threading
+import time
+from typing import Dict, Any, List
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from agentic_workflow.manager.workflow import AnnaWorkflow
-from agentic_workflow.resource import AnnaRequest, UserContext, LanguageCode
+from agentic_workflow.resource import AnnaRequest, UserContext, LanguageCode, LLMCache, LoggerFactory
 
+logger = LoggerFactory.get_logger("run_anna_coach")
 
-def create_default_request() -> Dict[str, Any]:
+
+# Fixed parts of every interactive request
+_USER_ID = "interactive_user"
+_LANG = LanguageCode.ENGLISH.value
+# Session and correlation IDs: process and start time, then a per-request counter
+_ID_PREFIX = f"{os.getpid():x}_{int(time.time()):x}_"
+_ID_COUNTER = itertools.count()
+
+_PROMPT_BANNER = "\n".join((
+    "",
+    "="*60,
+    "🤖 Anna AI Coach - Interactive Mode",
+    "="*60,
+    "Ask me anything about business, strategy, finance, legal, or technical topics!",
+    "Type 'quit' or 'exit' to stop the session.",
+    "-"*60,
+    ""
+))
+
+# Answers of the questions asked in this session, by question text (disable with --no-cache)
+_RESPONSE_CACHE = LLMCache(maxsize=32, ttl=3600)
+
+_RESPONSE_BANNER = "\n".join(("", "="*60, "🤖 Anna AI Coach Response", "="*60, ""))
+
+
+async def ainput(prompt: str = "") -> str:
     """
-    Create a default AnnaRequest dictionary structure
-    
-    Returns:
-        Dictionary with default AnnaRequest structure
-    """
-    return {
-        "language": {
-            "name": "English",
-            "code": "en"
-        },
-        "user_context": {
-            "user_id": "interactive_user",
-            "session_id": f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "prompt": "",
-            "correlation_id": f"corr_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        },
-        "follow_up": None,
-        "user_selection": None,
-        "scope": "",
-        "metadata": {
-            "source": "interactive_script",
-            "timestamp": datetime.now().isoformat(),
-            "version": "1.0.0"
-        },
-        "additional_data": {}
-    }
-
-
-def get_user_prompt() -> str:
+    input() that waits without blocking the event loop
+    The read runs in a daemon thread, so a pending read never keeps the process alive on exit.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(result=None, error=None):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def read():
+        try:
+            loop.call_soon_threadsafe(deliver, input(prompt))
+        except (EOFError, KeyboardInterrupt) as e:
+            loop.call_soon_threadsafe(deliver, None, e)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+async def get_user_prompt() -> str:
     """
     Get user prompt from command line input
     
     Returns:
         User's question/prompt
     """
-    print("\n" + "="*60)
-    print("🤖 Anna AI Coach - Interactive Mode")
-    print("="*60)
-    print("Ask me anything about business, strategy, finance, legal, or technical topics!")
-    print("Type 'quit' or 'exit' to stop the session.")
-    print("-"*60)
+    sys.stdout.write(_PROMPT_BANNER)
+    sys.stdout.flush()
     
     while True:
         try:
-            prompt = input("\n💬 Your question: ").strip()
+            prompt = (await ainput("\n💬 Your question: ")).strip()
             
             if not prompt:
                 print("❌ Please enter a question.")
@@ -83,38 +102,28 @@ def get_user_prompt() -> str:
             sys.exit(0)
 
 
-def update_request_with_prompt(request_dict: Dict[str, Any], prompt: str) -> AnnaRequest:
+def build_request(prompt: str) -> AnnaRequest:
     """
-    Update the request dictionary with user prompt and create AnnaRequest object
+    Create the AnnaRequest object for a user prompt
     
     Args:
-        request_dict: Base request dictionary
         prompt: User's question/prompt
         
     Returns:
         AnnaRequest object
     """
-    # Update the prompt in user_context
-    request_dict["user_context"]["prompt"] = prompt
-    
-    # Update correlation_id with timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    request_dict["user_context"]["correlation_id"] = f"corr_{timestamp}"
-    request_dict["user_context"]["session_id"] = f"session_{timestamp}"
+    # One sequence number for the correlation and session IDs of this turn, unique within the process
+    seq = f"{_ID_PREFIX}{next(_ID_COUNTER):x}"
     
-    # Update metadata timestamp
-    request_dict["metadata"]["timestamp"] = datetime.now().isoformat()
-    
-    # Create AnnaRequest object
     user_context = UserContext(
-        user_id=request_dict["user_context"]["user_id"],
-        session_id=request_dict["user_context"]["session_id"],
-        prompt=request_dict["user_context"]["prompt"],
-        correlation_id=request_dict["user_context"]["correlation_id"]
+        user_id=_USER_ID,
+        session_id=f"session_{seq}",
+        prompt=prompt,
+        correlation_id=f"corr_{seq}"
     )
     
     return AnnaRequest(
-        language=LanguageCode.ENGLISH.value,
+        language=_LANG,
         user_context=user_context,
         scope={}
     )
@@ -127,57 +136,111 @@ def print_response(response: Dict[str, Any]):
     Args:
         response: Response from the workflow
     """
-    print("\n" + "="*60)
-    print("🤖 Anna AI Coach Response")
-    print("="*60)
-    
     if not response:
-        print("❌ No response received from the workflow.")
-        return
-    
-    formated_response = response.get('formatted_response',{})
-    if formated_response:
-        print("📄 Response:")
-        print(formated_response.get('response', {}).get('summary', 'No summary available'))
+        text = "❌ No response received from the workflow."
     else:
-        print("📄 Response:")
-        print(response.get('content', 'No content available'))
+        formated_response = response.get('formatted_response',{})
+        if formated_response:
+            text = f"📄 Response:\n{formated_response.get('response', {}).get('summary', 'No summary available')}"
+        else:
+            text = f"📄 Response:\n{response.get('content', 'No content available')}"
+    
+    # One write per response instead of a print per line
+    sys.stdout.write(f"{_RESPONSE_BANNER}{text}\n")
+    sys.stdout.flush()
 
 
-async def run_anna_coach():
+async def read_piped_prompts() -> List[str]:
+    """
+    Read all questions from piped (non-interactive) input, one per line, up to a quit command
+    
+    Returns:
+        List of user questions
+    """
+    prompts = []
+    for line in await asyncio.to_thread(sys.stdin.readlines):
+        prompt = line.strip()
+        if prompt.lower() in ['quit', 'exit', 'q']:
+            break
+        if prompt:
+            prompts.append(prompt)
+    return prompts
+
+
+async def run_piped(workflow: AnnaWorkflow, prompts: List[str]):
+    """
+    Answer piped questions as one concurrent batch
+    
+    Args:
+        workflow: Initialized workflow
+        prompts: User questions
+    """
+    print(f"🔄 Processing {len(prompts)} questions...")
+    requests = [build_request(prompt) for prompt in prompts]
+    responses = await workflow.process_batch(requests)
+    
+    for prompt, response in zip(prompts, responses):
+        print(f"\n💬 Question: {prompt}")
+        if isinstance(response, Exception):
+            print(f"❌ Error processing request: {str(response)}")
+        else:
+            print_response(response)
+
+
+async def run_anna_coach(use_cache: bool = True):
     """
     Main function to run Anna AI Coach interactively
+    
+    Args:
+        use_cache: Answer a repeated question from the session's previous answer instead of rerunning the workflow
     """
     print("🚀 Starting Anna AI Coach...")
     
     try:
-        # Initialize the workflow
+        # Initialize the workflow in a worker thread while the user types the first question
         print("📋 Initializing workflow...")
-        workflow = AnnaWorkflow()
-        print("✅ Workflow initialized successfully!")
+        init_task = asyncio.create_task(asyncio.to_thread(AnnaWorkflow))
+        workflow = None
         
-        # Create default request structure
-        request_dict = create_default_request()
+        print(f"📝 Requests are sent as:")
+        print(f"   • Language: {LanguageCode.ENGLISH.name.title()}")
+        print(f"   • User ID: {_USER_ID}")
         
-        print(f"📝 Default request structure created:")
-        print(f"   • Language: {request_dict['language']['name']}")
-        print(f"   • Scope: {request_dict['scope']}")
-        print(f"   • User ID: {request_dict['user_context']['user_id']}")
+        # Piped input is answered as a single batch instead of turn by turn
+        if not sys.stdin.isatty():
+            prompts = await read_piped_prompts()
+            workflow = await init_task
+            print("✅ Workflow initialized successfully!")
+            if prompts:
+                await run_piped(workflow, prompts)
+            return
         
         # Main interaction loop
         while True:
             # Get user prompt
-            prompt = get_user_prompt()
+            prompt = await get_user_prompt()
+            
+            if workflow is None:
+                workflow = await init_task
+                print("✅ Workflow initialized successfully!")
+            
+            cached = _RESPONSE_CACHE.get(prompt) if use_cache else None
+            if cached is not None:
+                print("♻️  Same question as before, showing the previous answer.")
+                print_response(cached)
+                continue
             
             # Update request with user prompt
             print(f"🔄 Processing your question...")
-            request = update_request_with_prompt(request_dict, prompt)
+            request = build_request(prompt)
             
             try:
                 # Run the workflow
 
                 print(f"⚙️  Running workflow with correlation ID: {request.user_context.correlation_id}")
                 response = await workflow.process_request(request)
+                if use_cache and response:
+                    _RESPONSE_CACHE.set(prompt, response)
 
                 # Print the response
                 print_response(response)
@@ -185,14 +248,9 @@ async def run_anna_coach():
             except Exception as e:
                 print(f"\n❌ Error processing request: {str(e)}")
                 print("Please try again with a different question.")
-                print("Error details:",traceback.format_exc())
+                logger.error("Error processing request: %s", e, exc_info=True)
             
-            # Ask if user wants to continue
-            print("\n" + "-"*60)
-            continue_choice = input("🔄 Ask another question? (y/n): ").strip().lower()
-            if continue_choice not in ['y', 'yes', '']:
-                print("👋 Goodbye! Thanks for using Anna AI Coach.")
-                break
+            # The session continues until 'quit' or 'exit' is entered as the next question
     
     except Exception as e:
         print(f"❌ Failed to initialize Anna AI Coach: {str(e)}")
@@ -212,9 +270,23 @@ def main():
         print("⚠️  Warning: No .env file found. Make sure to set up your environment variables.")
         print("   You can copy env_sample.txt to .env and fill in your credentials.")
     
-    # Run the interactive session
+    # Use uvloop's faster event loop when it is installed (optional)
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    
+    # Run the interactive session; debug mode stays off even if PYTHONASYNCIODEBUG is set
+    session = run_anna_coach(use_cache="--no-cache" not in sys.argv[1:])
     try:
-        asyncio.run(run_anna_coach())
+        if hasattr(asyncio, "Runner"):
+            with asyncio.Runner(debug=False, loop_factory=uvloop.new_event_loop if uvloop else None) as runner:
+                runner.run(session)
+        else:
+            # Python 3.10 has no asyncio.Runner
+            if uvloop:
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            asyncio.run(session, debug=False)
     except KeyboardInterrupt:
         print("\n\n👋 Goodbye! Thanks for using Anna AI Coach.")
     except Exception as e: